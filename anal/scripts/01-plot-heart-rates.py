@@ -5,14 +5,11 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_resting_hr_colormap, create_general_hr_colormap
+from utils.plot_utils import load_dataset, heart_rate_figures
+from utils.render_utils import render_figures
 
 
 def main(args):
@@ -20,7 +17,7 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date'])
+    df = load_dataset(input_path, 'garmin')
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -31,60 +28,16 @@ def main(args):
                 print(f"\n{col}:")
                 print(df[col].describe())
 
-    # Define metrics to plot
-    metrics = [
-        ('min_hr', 'Minimum Heart Rate', create_general_hr_colormap()),
-        ('min_avg_hr', 'Minimum Average Heart Rate', create_general_hr_colormap()),
-        ('max_avg_hr', 'Maximum Average Heart Rate', create_general_hr_colormap()),
-        ('max_hr', 'Maximum Heart Rate', create_general_hr_colormap()),
-        ('resting_hr', 'Resting Heart Rate', create_resting_hr_colormap())
-    ]
-
-    for metric_col, metric_title, colormap in metrics:
-        if metric_col not in df.columns:
-            print(f"Warning: {metric_col} not found in data, skipping...")
-            continue
-
-        # Skip if no data
-        if df[metric_col].isna().all():
-            print(f"Warning: No data for {metric_col}, skipping...")
-            continue
-
-        print(f"Creating calendar visualization for {metric_title}...")
-        hr_series = pd.Series(df[metric_col].values, index=pd.to_datetime(df['date']))
-
-        # Set vmax based on metric type
-        if metric_col == 'resting_hr':
-            vmax = 150
-        else:
-            vmax = 220
+    print("Creating heart rate calendar visualizations...")
+    jobs = heart_rate_figures(df, output_prefix=args.output_prefix)
 
-        if args.verbose:
-            print(f"  Data range: {hr_series.min():.0f} - {hr_series.max():.0f}")
-
-        fig = plt.figure(figsize=(16, 10))
-        calplot.calplot(
-            hr_series,
-            textformat='{:.0f}',
-            textcolor='#999999',
-            cmap=colormap,
-            linewidth=0.0005,
-            edgecolor='white',
-            vmin=0,
-            vmax=vmax
-        )
-        plt.suptitle(metric_title, fontsize=20, y=0.98)
-
-        # Determine output filename
-        if args.output_prefix:
-            output_file = f"{args.output_prefix}_{metric_col}.png"
-            plt.savefig(output_file, bbox_inches='tight', dpi=100)
-            print(f"Saved {metric_title} to {output_file}")
+    if args.verbose:
+        for job in jobs:
+            print(f"  {job['name']} range: {job['series'].min():.0f} - {job['series'].max():.0f}")
 
-        if args.show_plot:
-            plt.show()
-        else:
-            plt.close()
+    render_figures(jobs, show=args.show_plot, workers=args.jobs,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -110,6 +63,33 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
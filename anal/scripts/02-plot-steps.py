@@ -5,23 +5,12 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_steps_colormap
-
-
-def categorize_steps(steps_cnt):
-    """Categorize step count into 3 bins."""
-    if steps_cnt <= 5000:
-        return 1
-    if steps_cnt <= 10000:
-        return 2
-    return 3
+from utils.plot_utils import load_dataset, prepare_steps, steps_figures
+from utils.render_utils import render_figures
+from utils.rollup_utils import read_rollup
 
 
 def main(args):
@@ -29,12 +18,14 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date'])
+    df = load_dataset(input_path, 'garmin')
+    # Year counts of the bar chart come from the rollup written by the prepare step
+    rollup = read_rollup(input_path)
+    if rollup is None:
+        print("No current rollup found, bar chart counts days per year and category")
 
     print("Processing step data...")
-    df['steps_k_cnt'] = df.apply(lambda row: round(row['steps_cnt'] / 1000), axis=1)
-    df['steps_cnt_grouped'] = df.apply(lambda row: categorize_steps(row['steps_cnt']), axis=1)
-    df['year'] = df.apply(lambda row: row['date'].year, axis=1)
+    df = prepare_steps(df)
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -42,78 +33,11 @@ def main(args):
         print("\nStep categories:")
         print(df['steps_cnt_grouped'].value_counts().sort_index())
 
-    # Create calendar plot
-    steps_series = pd.Series(df['steps_k_cnt'].values, index=df['date'])
-    steps_cmap = create_steps_colormap()
-
-    print("Creating calendar visualization...")
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        steps_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=steps_cmap,
-        linewidth=0.0005,
-        edgecolor='white'
-    )
-
-    if args.output_calendar:
-        plt.savefig(args.output_calendar, bbox_inches='tight', dpi=100)
-        print(f"Saved calendar plot to {args.output_calendar}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
-
-    # Create bar chart
-    print("Creating bar chart by year and category...")
-    grouped_steps = pd.DataFrame(df.groupby(['year', 'steps_cnt_grouped']).count()['date'])
-    grouped_steps = grouped_steps.reset_index()
-    grouped_steps_pivot = grouped_steps.pivot(
-        index='year',
-        columns='steps_cnt_grouped',
-        values='date'
-    ).add_prefix('steps_group_').reset_index()
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    width = 0.2
-
-    ax.bar(
-        x=grouped_steps_pivot['year'],
-        height=grouped_steps_pivot['steps_group_1'],
-        width=width,
-        color='#f3a0bc',
-        label='<=5k steps'
-    )
-    ax.bar(
-        x=grouped_steps_pivot['year'] + width,
-        height=grouped_steps_pivot['steps_group_2'],
-        width=width,
-        color='#f8e447',
-        label='5k-10k steps'
-    )
-    ax.bar(
-        x=grouped_steps_pivot['year'] + width * 2,
-        height=grouped_steps_pivot['steps_group_3'],
-        width=width,
-        color='#99ff66',
-        label='>10k steps'
-    )
-
-    ax.set_title('Steps over years', fontsize=18)
-    ax.set_xlabel('Year')
-    ax.set_ylabel('Days with steps')
-    ax.legend()
-
-    if args.output_bars:
-        plt.savefig(args.output_bars, bbox_inches='tight', dpi=100)
-        print(f"Saved bar chart to {args.output_bars}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    print("Creating calendar visualization and bar chart by year and category...")
+    jobs = steps_figures(df, output_calendar=args.output_calendar, output_bars=args.output_bars, rollup=rollup)
+    render_figures(jobs, show=args.show_plot, workers=args.jobs,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -143,6 +67,33 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
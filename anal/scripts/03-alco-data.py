@@ -6,22 +6,25 @@ from pathlib import Path
 import sys
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
 
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_alcohol_colormap
 from utils.nomie_utils import load_nomie_data, filter_alcohol_substances, get_daily_counts
+from utils.plot_utils import alcohol_figures
+from utils.render_utils import render_figures
+from utils.store_utils import upsert_daily
 
 
 def main(args):
     """Main execution function."""
     input_path = Path(args.input)
 
+    # Optional watermark (epoch ms) so only recent events are loaded
+    watermark = pd.Timestamp(args.since).value // 10**6 if args.since else None
+
     print(f"Loading Nomie data from {input_path}")
-    nomie_df = load_nomie_data(input_path)
+    nomie_df = load_nomie_data(input_path, watermark=watermark)
 
     if args.substance:
         # Parse comma-separated substances
@@ -39,31 +42,16 @@ def main(args):
         print("\nBreakdown by year:")
         print(nomie_df['year'].value_counts().sort_index())
 
-    # Get daily counts
-    daily_counts = get_daily_counts(nomie_df)
-    max_per_day = int(daily_counts.max())
-
-    print(f"Creating calendar visualization (max {max_per_day} per day)...")
-    alcohol_cmap = create_alcohol_colormap(max_per_day, limit_good=1, limit_ok=3)
-
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        daily_counts,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=alcohol_cmap,
-        linewidth=0.0005,
-        edgecolor='white'
-    )
-
-    if args.output:
-        plt.savefig(args.output, bbox_inches='tight', dpi=100)
-        print(f"Saved calendar plot to {args.output}")
+    if args.store and not args.substance:
+        daily_counts = get_daily_counts(nomie_df)
+        store_df = pd.DataFrame({'date': daily_counts.index, 'alcohol_count': daily_counts.values})
+        print(f"Upserting {upsert_daily(args.store, store_df)} days into {args.store}")
 
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    print("Creating calendar visualization...")
+    jobs = alcohol_figures(nomie_df, output=args.output)
+    render_figures(jobs, show=args.show_plot,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -73,7 +61,11 @@ if __name__ == '__main__':
     parser.add_argument(
         '--input',
         default='../../data/my_nomie_events.json',
-        help='Input Nomie JSON file (default: ../../data/my_nomie_events.json)'
+        help='Input Nomie JSON file or n3-events SQLite database (default: ../../data/my_nomie_events.json)'
+    )
+    parser.add_argument(
+        '--since',
+        help='Only load events on or after this date, e.g. 2023-01-01 (JSON or SQLite input)'
     )
     parser.add_argument(
         '--output',
@@ -93,6 +85,32 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--store',
+        help='Also upsert daily alcohol counts into this SQLite daily store (e.g. ../../data/my_daily.db); '
+             'skipped with --substance'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
@@ -5,15 +5,13 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_business_hours_colormap
 from utils.toggl_utils import load_toggl_hours
+from utils.plot_utils import business_hours_figures
+from utils.render_utils import render_figures
+from utils.store_utils import upsert_daily
 
 
 def main(args):
@@ -33,7 +31,8 @@ def main(args):
     all_dates_business_hours = load_toggl_hours(
         toggl_path,
         clients_exclude=clients_exclude,
-        clients_include=clients_include
+        clients_include=clients_include,
+        cache_dir=None if args.no_cache else Path(args.cache_dir)
     )
 
     if args.verbose:
@@ -42,31 +41,15 @@ def main(args):
         print(f"\nDaily hours statistics:")
         print(all_dates_business_hours['duration_h'].describe())
 
-    print("Creating calendar visualization...")
-    duration_series = pd.Series(
-        all_dates_business_hours['duration_h'].values,
-        index=all_dates_business_hours['date']
-    )
-    business_cmap = create_business_hours_colormap()
-
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        duration_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=business_cmap,
-        linewidth=0.0005,
-        edgecolor='white'
-    )
-
-    if args.output:
-        plt.savefig(args.output, bbox_inches='tight', dpi=1000)
-        print(f"Saved calendar plot to {args.output}")
+    if args.store:
+        store_df = all_dates_business_hours.rename(columns={'duration_h': 'business_hours'})
+        print(f"Upserting {upsert_daily(args.store, store_df)} days into {args.store}")
 
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    print("Creating calendar visualization...")
+    jobs = business_hours_figures(all_dates_business_hours, output=args.output)
+    render_figures(jobs, show=args.show_plot,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -100,6 +83,41 @@ if __name__ == '__main__':
         '--clients-include',
         help='Comma-separated list of clients to include (e.g., "eclipse,acme")'
     )
+    parser.add_argument(
+        '--cache-dir',
+        default='../../data/toggl-cache/',
+        help='Directory for cached per-file daily totals (default: ../../data/toggl-cache/)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Parse all Toggl files without reading or writing the cache'
+    )
+    parser.add_argument(
+        '--store',
+        help='Also upsert daily hours into this SQLite daily store (e.g. ../../data/my_daily.db)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
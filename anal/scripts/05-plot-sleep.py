@@ -5,23 +5,12 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_sleep_colormap
-
-
-def categorize_sleep(sleep_hours):
-    """Categorize sleep duration into 3 bins."""
-    if sleep_hours < 7:
-        return 1  # Too little (includes toxic red and pink)
-    if sleep_hours <= 8:
-        return 2  # Good (7-8h)
-    return 3  # Very good (dark greens)
+from utils.plot_utils import load_dataset, prepare_sleep, sleep_figures
+from utils.render_utils import render_figures
+from utils.rollup_utils import read_rollup
 
 
 def main(args):
@@ -29,12 +18,14 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date', 'sleep_start', 'sleep_end'])
+    df = load_dataset(input_path, 'sleep')
+    # Year counts of the bar chart come from the rollup written by the prepare step
+    rollup = read_rollup(input_path)
+    if rollup is None:
+        print("No current rollup found, bar chart counts days per year and category")
 
     print("Processing sleep data...")
-    df['sleep_hours_rounded'] = df['sleep_duration_h'].round()
-    df['sleep_category'] = df['sleep_duration_h'].apply(categorize_sleep)
-    df['year'] = df['date'].dt.year
+    df = prepare_sleep(df)
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -44,83 +35,11 @@ def main(args):
         print("\nSleep categories:")
         print(df['sleep_category'].value_counts().sort_index())
 
-    # Create calendar plot
-    sleep_series = pd.Series(df['sleep_hours_rounded'].values, index=df['date'])
-    sleep_cmap = create_sleep_colormap()
-
-    print("Creating calendar visualization...")
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        sleep_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=sleep_cmap,
-        linewidth=0.0005,
-        edgecolor='white'
-    )
-
-    if args.output_calendar:
-        plt.savefig(args.output_calendar, bbox_inches='tight', dpi=100)
-        print(f"Saved calendar plot to {args.output_calendar}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
-
-    # Create bar chart
-    print("Creating bar chart by year and category...")
-    grouped_sleep = pd.DataFrame(df.groupby(['year', 'sleep_category']).count()['date'])
-    grouped_sleep = grouped_sleep.reset_index()
-    grouped_sleep_pivot = grouped_sleep.pivot(
-        index='year',
-        columns='sleep_category',
-        values='date'
-    ).add_prefix('sleep_cat_').reset_index()
-
-    # Fill missing columns with 0
-    for col in ['sleep_cat_1', 'sleep_cat_2', 'sleep_cat_3']:
-        if col not in grouped_sleep_pivot.columns:
-            grouped_sleep_pivot[col] = 0
-
-    fig, ax = plt.subplots(figsize=(12, 6))
-    width = 0.2
-
-    ax.bar(
-        x=grouped_sleep_pivot['year'],
-        height=grouped_sleep_pivot['sleep_cat_1'],
-        width=width,
-        color='#f3a0bc',
-        label='<7h sleep'
-    )
-    ax.bar(
-        x=grouped_sleep_pivot['year'] + width,
-        height=grouped_sleep_pivot['sleep_cat_2'],
-        width=width,
-        color='#99ff66',
-        label='7-8h sleep'
-    )
-    ax.bar(
-        x=grouped_sleep_pivot['year'] + width * 2,
-        height=grouped_sleep_pivot['sleep_cat_3'],
-        width=width,
-        color='#66cc33',
-        label='>8h sleep'
-    )
-
-    ax.set_title('Sleep duration over years', fontsize=18)
-    ax.set_xlabel('Year')
-    ax.set_ylabel('Days')
-    ax.legend()
-
-    if args.output_bars:
-        plt.savefig(args.output_bars, bbox_inches='tight', dpi=100)
-        print(f"Saved bar chart to {args.output_bars}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    print("Creating calendar visualization and bar chart by year and category...")
+    jobs = sleep_figures(df, output_calendar=args.output_calendar, output_bars=args.output_bars, rollup=rollup)
+    render_figures(jobs, show=args.show_plot, workers=args.jobs,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -150,6 +69,33 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
@@ -5,27 +5,12 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_stress_colormap
-
-
-def categorize_stress(stress_level):
-    """Categorize stress level into 4 bins."""
-    if pd.isna(stress_level):
-        return None
-    if stress_level <= 25:
-        return 1  # Very low (dark green)
-    if stress_level <= 40:
-        return 2  # Low (green)
-    if stress_level <= 60:
-        return 3  # Moderate (pink)
-    return 4  # High (red)
+from utils.plot_utils import load_dataset, prepare_stress, stress_figures
+from utils.render_utils import render_figures
+from utils.rollup_utils import read_rollup
 
 
 def main(args):
@@ -33,11 +18,14 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date'])
+    df = load_dataset(input_path, 'stress')
+    # Year counts of the bar chart come from the rollup written by the prepare step
+    rollup = read_rollup(input_path)
+    if rollup is None:
+        print("No current rollup found, bar chart counts days per year and category")
 
     print("Processing stress data...")
-    df['stress_category'] = df['avg_stress_level'].apply(categorize_stress)
-    df['year'] = df['date'].dt.year
+    df = prepare_stress(df)
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -48,95 +36,11 @@ def main(args):
         print("\nStress categories:")
         print(df['stress_category'].value_counts().sort_index())
 
-    # Create calendar plot
-    stress_series = pd.Series(df['avg_stress_level'].values, index=pd.to_datetime(df['date']))
-    stress_cmap = create_stress_colormap()
-
-    print("Creating calendar visualization...")
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        stress_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=stress_cmap,
-        linewidth=0.0005,
-        edgecolor='white',
-        vmin=0
-    )
-
-    if args.output_calendar:
-        plt.savefig(args.output_calendar, bbox_inches='tight', dpi=100)
-        print(f"Saved calendar plot to {args.output_calendar}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
-
-    # Create bar chart
-    print("Creating bar chart by year and category...")
-    # Filter out rows with no stress data for bar chart
-    df_with_stress = df[df['stress_category'].notna()].copy()
-
-    if not df_with_stress.empty:
-        grouped_stress = pd.DataFrame(df_with_stress.groupby(['year', 'stress_category']).count()['date'])
-        grouped_stress = grouped_stress.reset_index()
-        grouped_stress_pivot = grouped_stress.pivot(
-            index='year',
-            columns='stress_category',
-            values='date'
-        ).add_prefix('stress_cat_').reset_index()
-
-        # Fill missing columns with 0
-        for col in ['stress_cat_1', 'stress_cat_2', 'stress_cat_3', 'stress_cat_4']:
-            if col not in grouped_stress_pivot.columns:
-                grouped_stress_pivot[col] = 0
-
-        fig, ax = plt.subplots(figsize=(12, 6))
-        width = 0.2
-
-        ax.bar(
-            x=grouped_stress_pivot['year'],
-            height=grouped_stress_pivot['stress_cat_1'],
-            width=width,
-            color='#66cc33',
-            label='Very low (0-25)'
-        )
-        ax.bar(
-            x=grouped_stress_pivot['year'] + width,
-            height=grouped_stress_pivot['stress_cat_2'],
-            width=width,
-            color='#99ff66',
-            label='Low (26-40)'
-        )
-        ax.bar(
-            x=grouped_stress_pivot['year'] + width * 2,
-            height=grouped_stress_pivot['stress_cat_3'],
-            width=width,
-            color='#f3a0bc',
-            label='Moderate (41-60)'
-        )
-        ax.bar(
-            x=grouped_stress_pivot['year'] + width * 3,
-            height=grouped_stress_pivot['stress_cat_4'],
-            width=width,
-            color='#ff0000',
-            label='High (61+)'
-        )
-
-        ax.set_title('Stress levels over years', fontsize=18)
-        ax.set_xlabel('Year')
-        ax.set_ylabel('Days')
-        ax.legend()
-
-        if args.output_bars:
-            plt.savefig(args.output_bars, bbox_inches='tight', dpi=100)
-            print(f"Saved bar chart to {args.output_bars}")
-
-        if args.show_plot:
-            plt.show()
-        else:
-            plt.close()
+    print("Creating calendar visualization and bar chart by year and category...")
+    jobs = stress_figures(df, output_calendar=args.output_calendar, output_bars=args.output_bars, rollup=rollup)
+    render_figures(jobs, show=args.show_plot, workers=args.jobs,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -166,6 +70,33 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
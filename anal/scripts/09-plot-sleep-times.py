@@ -5,26 +5,11 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_bedtime_colormap, create_waketime_colormap
-
-
-def extract_hour_decimal(dt_series):
-    """Extract hour as decimal from datetime series.
-
-    Args:
-        dt_series: Pandas datetime series
-
-    Returns:
-        Series with hours as decimals (e.g., 22.5 for 22:30)
-    """
-    return dt_series.dt.hour + dt_series.dt.minute / 60.0
+from utils.plot_utils import load_dataset, prepare_sleep_times, sleep_time_figures
+from utils.render_utils import render_figures
 
 
 def main(args):
@@ -32,11 +17,10 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date', 'sleep_start', 'sleep_end'])
+    df = load_dataset(input_path, 'garmin')
 
     # Extract hours from sleep times
-    df['bedtime_hour'] = extract_hour_decimal(df['sleep_start'])
-    df['waketime_hour'] = extract_hour_decimal(df['sleep_end'])
+    df = prepare_sleep_times(df)
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -47,57 +31,11 @@ def main(args):
         print("\nWake time statistics:")
         print(df['waketime_hour'].describe())
 
-    # Visualize bedtime (sleep start)
-    print("Creating bedtime calendar visualization...")
-    bedtime_series = pd.Series(df['bedtime_hour'].values, index=pd.to_datetime(df['date']))
-    bedtime_cmap = create_bedtime_colormap()
-
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        bedtime_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=bedtime_cmap,
-        linewidth=0.0005,
-        edgecolor='white',
-        vmin=0,
-        vmax=24
-    )
-
-    if args.output_bedtime:
-        plt.savefig(args.output_bedtime, bbox_inches='tight', dpi=100)
-        print(f"Saved bedtime calendar to {args.output_bedtime}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
-
-    # Visualize wake time (sleep end)
-    print("Creating wake time calendar visualization...")
-    waketime_series = pd.Series(df['waketime_hour'].values, index=pd.to_datetime(df['date']))
-    waketime_cmap = create_waketime_colormap()
-
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        waketime_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=waketime_cmap,
-        linewidth=0.0005,
-        edgecolor='white',
-        vmin=0,
-        vmax=24
-    )
-
-    if args.output_waketime:
-        plt.savefig(args.output_waketime, bbox_inches='tight', dpi=100)
-        print(f"Saved wake time calendar to {args.output_waketime}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    print("Creating bedtime and wake time calendar visualizations...")
+    jobs = sleep_time_figures(df, output_bedtime=args.output_bedtime, output_waketime=args.output_waketime)
+    render_figures(jobs, show=args.show_plot, workers=args.jobs,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -127,6 +65,33 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
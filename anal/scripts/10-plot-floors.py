@@ -5,14 +5,11 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import calplot
-
 # Add parent directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.colormap_utils import create_floors_colormap
+from utils.plot_utils import load_dataset, floors_figures
+from utils.render_utils import render_figures
 
 
 def main(args):
@@ -20,7 +17,7 @@ def main(args):
     input_path = Path(args.input)
 
     print(f"Loading data from {input_path}")
-    df = pd.read_csv(input_path, sep='\t', parse_dates=['date'])
+    df = load_dataset(input_path, 'garmin')
 
     if args.verbose:
         print(f"Data range: {df['date'].min()} to {df['date'].max()}")
@@ -31,31 +28,11 @@ def main(args):
         print(f"\nMax floors climbed: {df['floors_climbed'].max():.1f} floors")
         print(f"Mean floors climbed: {df['floors_climbed'].mean():.1f} floors")
 
-    # Create calendar visualization
     print("Creating floors climbed calendar visualization...")
-    floors_series = pd.Series(df['floors_climbed'].values, index=pd.to_datetime(df['date']))
-    floors_cmap = create_floors_colormap()
-
-    fig = plt.figure(figsize=(16, 10))
-    calplot.calplot(
-        floors_series,
-        textformat='{:.0f}',
-        textcolor='#999999',
-        cmap=floors_cmap,
-        linewidth=0.0005,
-        edgecolor='white',
-        vmin=0,
-        vmax=100
-    )
-
-    if args.output:
-        plt.savefig(args.output, bbox_inches='tight', dpi=100)
-        print(f"Saved floors calendar to {args.output}")
-
-    if args.show_plot:
-        plt.show()
-    else:
-        plt.close()
+    jobs = floors_figures(df, output=args.output)
+    render_figures(jobs, show=args.show_plot,
+                   cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+                   year_tiles=args.year_tiles, backend=args.backend)
 
 
 if __name__ == '__main__':
@@ -81,6 +58,27 @@ if __name__ == '__main__':
         action='store_true',
         help='Print analysis summary'
     )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
 
     args = parser.parse_args()
     main(args)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark the derived-features stage against row-wise DataFrame.apply.
+
+Builds a synthetic daily dataset, computes rounded steps, step bins, years
+and decimal bed/wake hours both the old row-by-row way and with
+feature_utils.derive_features, checks that the results are identical and
+prints the timings.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.feature_utils import derive_features
+from utils.plot_utils import FEATURES
+
+
+def synthetic_days(days: int, seed: int = 0) -> pd.DataFrame:
+    """Create a random daily dataset with steps, sleep duration and sleep times.
+
+    Args:
+        days: Number of days
+        seed: Random seed
+
+    Returns:
+        DataFrame with date, steps_cnt, sleep_duration_h, sleep_start and sleep_end
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('1990-01-01', periods=days, freq='D')
+    sleep_start = dates - pd.to_timedelta(rng.integers(0, 4 * 60, days), unit='min')
+    sleep_duration_h = rng.integers(4 * 60, 10 * 60, days) / 60.0
+    return pd.DataFrame({
+        'date': dates,
+        # Multiples of 500 exercise rounding halves to even
+        'steps_cnt': (rng.integers(0, 50, days) * 500).astype(np.float64),
+        'sleep_duration_h': sleep_duration_h,
+        'sleep_start': sleep_start,
+        'sleep_end': sleep_start + pd.to_timedelta(sleep_duration_h, unit='h'),
+    })
+
+
+def row_wise(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute the features one row at a time, as the plot scripts used to."""
+    df = df.copy()
+    df['steps_k_cnt'] = df.apply(lambda row: round(row['steps_cnt'] / 1000), axis=1)
+    df['steps_cnt_grouped'] = df.apply(
+        lambda row: 1 if row['steps_cnt'] <= 5000 else (2 if row['steps_cnt'] <= 10000 else 3),
+        axis=1
+    )
+    df['year'] = df.apply(lambda row: row['date'].year, axis=1)
+    df['sleep_hours_rounded'] = df['sleep_duration_h'].round()
+    df['bedtime_hour'] = df['sleep_start'].dt.hour + df['sleep_start'].dt.minute / 60.0
+    df['waketime_hour'] = df['sleep_end'].dt.hour + df['sleep_end'].dt.minute / 60.0
+    return df
+
+
+def vectorized(df: pd.DataFrame) -> pd.DataFrame:
+    """Compute the same features with the derived-features stage."""
+    return derive_features(df, FEATURES['steps'] + FEATURES['sleep'][:1] + FEATURES['sleep_times'])
+
+
+def main(args):
+    """Main execution function."""
+    df = synthetic_days(args.days)
+    print(f"Benchmarking {len(df)} days, best of {args.repeat}")
+
+    expected = row_wise(df)
+    result = vectorized(df)
+    for column in ['steps_k_cnt', 'steps_cnt_grouped', 'year', 'sleep_hours_rounded', 'bedtime_hour', 'waketime_hour']:
+        if not np.array_equal(expected[column].to_numpy(dtype=np.float64), result[column].to_numpy(dtype=np.float64)):
+            sys.exit(f"Mismatch in {column}")
+    if expected['steps_k_cnt'].dtype != result['steps_k_cnt'].dtype:
+        sys.exit("Mismatch in steps_k_cnt dtype")
+    print("Results are identical")
+
+    row_wise_s = min(timeit.repeat(lambda: row_wise(df), number=1, repeat=args.repeat))
+    vectorized_s = min(timeit.repeat(lambda: vectorized(df), number=1, repeat=args.repeat))
+    print(f"Row-wise apply:  {row_wise_s * 1000:10.1f} ms")
+    print(f"Feature stage:   {vectorized_s * 1000:10.1f} ms")
+    print(f"Speedup:         {row_wise_s / vectorized_s:10.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark the derived-features stage against row-wise DataFrame.apply'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=36500,
+        help='Number of synthetic days (default: 36500)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Timing repetitions, the best one is reported (default: 3)'
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Build a per-day feature matrix across Garmin, Nomie and Toggl data.
+
+All sources are aligned on one dense day-number axis with
+daily_utils.join_daily, giving one row per day and one column per metric
+for cross-metric analyses such as sleep vs. work hours vs. alcohol.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.cache_utils import write_frame
+from utils.daily_utils import join_daily
+from utils.nomie_utils import load_nomie_data, filter_alcohol_substances, get_daily_counts
+from utils.plot_utils import load_datasets
+from utils.toggl_utils import load_toggl_hours
+
+
+# Columns taken from each prepared dataset; sleep times come from the
+# combined Garmin data, so only the duration is taken from the sleep data
+SOURCE_COLUMNS = {
+    'garmin': None,
+    'sleep': ['sleep_duration_h'],
+    'activities': ['activity_count'],
+    'stress': ['avg_stress_level', 'max_stress_level'],
+}
+
+# Metrics compared by --verbose
+SUMMARY_COLUMNS = ['sleep_duration_h', 'business_hours', 'alcohol_count', 'steps_cnt', 'avg_stress_level']
+
+
+def collect_sources(datasets: dict) -> list:
+    """Select the daily frames to join.
+
+    Args:
+        datasets: Result of load_datasets, optionally with 'nomie' and 'toggl'
+
+    Returns:
+        List of DataFrames with a 'date' column and one row per day
+    """
+    frames = []
+    for name, columns in SOURCE_COLUMNS.items():
+        if name in datasets:
+            df = datasets[name]
+            frames.append(df if columns is None else df[['date'] + columns])
+
+    if 'nomie' in datasets:
+        daily_counts = get_daily_counts(filter_alcohol_substances(datasets['nomie']))
+        frames.append(pd.DataFrame({'date': daily_counts.index, 'alcohol_count': daily_counts.values}))
+
+    if 'toggl' in datasets:
+        frames.append(datasets['toggl'].rename(columns={'duration_h': 'business_hours'}))
+
+    return frames
+
+
+def main(args):
+    """Main execution function."""
+    datasets = load_datasets(Path(args.data_dir))
+
+    nomie_path = Path(args.nomie_input)
+    if nomie_path.exists():
+        print(f"Loading Nomie data from {nomie_path}")
+        datasets['nomie'] = load_nomie_data(nomie_path)
+    else:
+        print(f"Warning: {nomie_path} not found, skipping alcohol counts...")
+
+    toggl_path = Path(args.toggl_path)
+    if toggl_path.is_dir():
+        print(f"Loading Toggl data from {toggl_path}")
+        datasets['toggl'] = load_toggl_hours(toggl_path, cache_dir=Path(args.data_dir) / 'toggl-cache')
+    else:
+        print(f"Warning: {toggl_path} not found, skipping business hours...")
+
+    frames = collect_sources(datasets)
+    if not frames:
+        print("Error: No daily data found")
+        return
+
+    print(f"Aligning {len(frames)} sources by day...")
+    df = join_daily(frames, start=args.start, end=args.end)
+
+    print(f"Saving {len(df)} days x {len(df.columns) - 1} features to {args.output}")
+    write_frame(df, Path(args.output))
+
+    if args.verbose:
+        print(f"\nDate range: {df['date'].min()} to {df['date'].max()}")
+        print("\nDays with data per feature:")
+        print(df.drop(columns='date').notna().sum())
+        summary = [column for column in SUMMARY_COLUMNS if column in df.columns]
+        print("\nCorrelation between metrics (days with both values):")
+        print(df[summary].corr().round(2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Build a per-day feature matrix across Garmin, Nomie and Toggl data'
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='../../data/',
+        help='Directory with prepared TSV files (default: ../../data/)'
+    )
+    parser.add_argument(
+        '--nomie-input',
+        default='../../data/my_nomie_events.json',
+        help='Input Nomie JSON file or n3-events SQLite database (default: ../../data/my_nomie_events.json)'
+    )
+    parser.add_argument(
+        '--toggl-path',
+        default='../../raw-data/toggl-export/data/',
+        help='Path to Toggl CSV files (default: ../../raw-data/toggl-export/data/)'
+    )
+    parser.add_argument(
+        '--output',
+        default='../../data/my_daily_features.tsv',
+        help='Output TSV file path (default: ../../data/my_daily_features.tsv)'
+    )
+    parser.add_argument(
+        '--start',
+        help='First day of the matrix, e.g. 2020-01-01 (default: earliest date in any source)'
+    )
+    parser.add_argument(
+        '--end',
+        help='Last day of the matrix (default: latest date in any source)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print coverage and correlations between metrics'
+    )
+
+    args = parser.parse_args()
+    main(args)
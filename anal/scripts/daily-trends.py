@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Compute rolling means, week-over-week deltas and streaks of daily metrics.
+
+Reads the per-day feature table written by daily-features.py and computes
+the trends of all metrics at once with utils.trend_utils. With
+--incremental only days appended since the previous run are recomputed.
+"""
+
+import argparse
+import hashlib
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.cache_utils import write_frame, read_frame
+from utils.manifest_utils import manifest_path_for, load_manifest, save_manifest, scan_files
+from utils.trend_utils import ROLLING_WINDOWS, STREAKS, compute_trends, update_trends
+
+
+def history_digest(daily: pd.DataFrame, days: int) -> str:
+    """Fingerprint of the first days of the daily data.
+
+    Args:
+        daily: Daily DataFrame
+        days: Number of leading rows to hash
+
+    Returns:
+        Hex digest, unchanged as long as those rows are
+    """
+    hashes = pd.util.hash_pandas_object(daily.iloc[:days], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def main(args):
+    """Main execution function."""
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    windows = tuple(sorted(set(args.windows)))
+
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    changed_files, entries = scan_files([input_path], manifest)
+    previous_options = manifest['options'] or {}
+
+    incremental = (
+        args.incremental and output_path.exists()
+        and previous_options.get('windows') == list(windows)
+        and previous_options.get('streaks') == sorted(STREAKS)
+    )
+    if incremental and not changed_files:
+        print(f"{input_path} is unchanged, {output_path} is up to date")
+        return
+
+    print(f"Loading daily data from {input_path}")
+    daily = read_frame(input_path, parse_dates=['date', 'sleep_start', 'sleep_end'])
+
+    trends = read_frame(output_path, parse_dates=['date']) if incremental else None
+    # Reuse earlier rows only if the days before the last computed one are unchanged
+    if trends is not None and previous_options.get('history') != history_digest(daily, len(trends) - 1):
+        print("Earlier days changed, recomputing all trends")
+        trends = None
+
+    if trends is not None:
+        print(f"Incremental update: recomputing days from {trends['date'].iloc[-1].date()}")
+        trends = update_trends(trends, daily, windows=windows)
+    else:
+        print(f"Computing trends for {len(daily)} days...")
+        trends = compute_trends(daily, windows=windows)
+
+    print(f"Saving {len(trends.columns) - 1} trend columns to {output_path}")
+    write_frame(trends, output_path)
+    save_manifest(manifest_path, entries, {
+        'windows': list(windows),
+        'streaks': sorted(STREAKS),
+        'history': history_digest(daily, len(trends) - 1),
+    })
+
+    if args.verbose and not trends.empty:
+        latest = trends.iloc[-1]
+        print(f"\nTrends on {latest['date'].date()}:")
+        print(latest.drop('date').dropna().to_string())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compute rolling means, week-over-week deltas and streaks of daily metrics'
+    )
+    parser.add_argument(
+        '--input',
+        default='../../data/my_daily_features.tsv',
+        help='Per-day feature table from daily-features.py (default: ../../data/my_daily_features.tsv)'
+    )
+    parser.add_argument(
+        '--output',
+        default='../../data/my_daily_trends.tsv',
+        help='Output TSV file path (default: ../../data/my_daily_trends.tsv)'
+    )
+    parser.add_argument(
+        '--windows',
+        type=int,
+        nargs='+',
+        default=list(ROLLING_WINDOWS),
+        help='Rolling mean windows in days (default: 7 30 90)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only recompute days appended since the previous run'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print the trends of the latest day'
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Render every calendar and bar chart in one process.
+
+Each prepared dataset is loaded once and shared by all plots that use it,
+instead of every plot script importing the plotting stack and re-reading
+its TSV on its own.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.nomie_utils import load_nomie_data, filter_alcohol_substances
+from utils.toggl_utils import load_toggl_hours
+from utils.plot_utils import (
+    load_datasets,
+    load_store_datasets,
+    load_rollups,
+    heart_rate_figures,
+    prepare_steps,
+    steps_figures,
+    prepare_sleep,
+    sleep_figures,
+    prepare_activities,
+    activities_figures,
+    prepare_stress,
+    stress_figures,
+    prepare_sleep_times,
+    sleep_time_figures,
+    floors_figures,
+    alcohol_figures,
+    business_hours_figures,
+)
+from utils.render_utils import render_figures
+
+
+def collect_figures(datasets: dict, output_dir: Path, rollups: dict = None) -> list:
+    """Build figure jobs for all plots whose dataset is available.
+
+    Args:
+        datasets: Result of load_datasets, optionally with 'nomie' and 'toggl'
+        output_dir: Directory for PNG files
+        rollups: Result of load_rollups, used by the bar charts (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    rollups = rollups or {}
+    jobs = []
+
+    if 'garmin' in datasets:
+        garmin = datasets['garmin']
+        jobs += heart_rate_figures(garmin, output_prefix=str(output_dir / 'hr'))
+        jobs += steps_figures(
+            prepare_steps(garmin),
+            output_calendar=output_dir / 'steps_calendar.png',
+            output_bars=output_dir / 'steps_bars.png',
+            rollup=rollups.get('garmin')
+        )
+        jobs += sleep_time_figures(
+            prepare_sleep_times(garmin),
+            output_bedtime=output_dir / 'bedtime_calendar.png',
+            output_waketime=output_dir / 'waketime_calendar.png'
+        )
+        jobs += floors_figures(garmin, output=output_dir / 'floors_calendar.png')
+
+    if 'sleep' in datasets:
+        jobs += sleep_figures(
+            prepare_sleep(datasets['sleep']),
+            output_calendar=output_dir / 'sleep_calendar.png',
+            output_bars=output_dir / 'sleep_bars.png',
+            rollup=rollups.get('sleep')
+        )
+
+    if 'activities' in datasets:
+        jobs += activities_figures(
+            prepare_activities(datasets['activities']),
+            output_calendar=output_dir / 'activities_calendar.png',
+            output_bars=output_dir / 'activities_bars.png',
+            rollup=rollups.get('activities')
+        )
+
+    if 'stress' in datasets:
+        jobs += stress_figures(
+            prepare_stress(datasets['stress']),
+            output_calendar=output_dir / 'stress_calendar.png',
+            output_bars=output_dir / 'stress_bars.png',
+            rollup=rollups.get('stress')
+        )
+
+    if 'nomie' in datasets:
+        jobs += alcohol_figures(
+            filter_alcohol_substances(datasets['nomie']),
+            output=output_dir / 'alcohol_calendar.png'
+        )
+
+    if 'toggl' in datasets:
+        jobs += business_hours_figures(datasets['toggl'], output=output_dir / 'business_hours_calendar.png')
+
+    return jobs
+
+
+def main(args):
+    """Main execution function."""
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.store:
+        # Garmin and Toggl days come from the store, limited to the requested range
+        print(f"Loading daily data from {args.store}")
+        datasets = load_store_datasets(Path(args.store), start=args.start, end=args.end)
+        # Rollups cover the prepared files, not a range of the store
+        rollups = {}
+    else:
+        datasets = load_datasets(Path(args.data_dir))
+        rollups = load_rollups(Path(args.data_dir))
+
+    nomie_path = Path(args.nomie_input)
+    if nomie_path.exists():
+        print(f"Loading Nomie data from {nomie_path}")
+        datasets['nomie'] = load_nomie_data(nomie_path)
+    else:
+        print(f"Warning: {nomie_path} not found, skipping alcohol plot...")
+
+    # With --store, Toggl hours were read from the store
+    toggl_path = Path(args.toggl_path)
+    if not args.store:
+        if toggl_path.is_dir():
+            print(f"Loading Toggl data from {toggl_path}")
+            datasets['toggl'] = load_toggl_hours(toggl_path, cache_dir=Path(args.data_dir) / 'toggl-cache')
+        else:
+            print(f"Warning: {toggl_path} not found, skipping business hours plot...")
+
+    jobs = collect_figures(datasets, output_dir, rollups=rollups)
+    print(f"Rendering {len(jobs)} figures to {output_dir}")
+    written = render_figures(
+        jobs,
+        workers=args.jobs,
+        cache_dir=None if args.no_render_cache else Path(args.render_cache_dir),
+        year_tiles=args.year_tiles,
+        backend=args.backend
+    )
+    print(f"Wrote {len(written)} files")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Render all calendar and bar chart plots in one process'
+    )
+    parser.add_argument(
+        '--data-dir',
+        default='../../data/',
+        help='Directory with prepared TSV files (default: ../../data/)'
+    )
+    parser.add_argument(
+        '--nomie-input',
+        default='../../data/my_nomie_events.json',
+        help='Input Nomie JSON file or n3-events SQLite database (default: ../../data/my_nomie_events.json)'
+    )
+    parser.add_argument(
+        '--toggl-path',
+        default='../../raw-data/toggl-export/data/',
+        help='Path to Toggl CSV files (default: ../../raw-data/toggl-export/data/)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default='../../data/plots/',
+        help='Directory for PNG files (default: ../../data/plots/)'
+    )
+    parser.add_argument(
+        '--store',
+        help='Read Garmin and Toggl days from this SQLite daily store instead of the TSVs and CSVs'
+    )
+    parser.add_argument(
+        '--start',
+        help='First date to plot from the store, e.g. 2023-01-01 (with --store)'
+    )
+    parser.add_argument(
+        '--end',
+        help='Last date to plot from the store, e.g. 2023-12-31 (with --store)'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to render figures in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--render-cache-dir',
+        default='../../data/render-cache/',
+        help='Directory of cached renders reused when a figure\'s content is unchanged (default: ../../data/render-cache/)'
+    )
+    parser.add_argument(
+        '--no-render-cache',
+        action='store_true',
+        help='Always redraw figures without reading or writing the render cache'
+    )
+    parser.add_argument(
+        '--year-tiles',
+        action='store_true',
+        help='Render calendars as per-year tiles cached separately and stitched together'
+    )
+    parser.add_argument(
+        '--backend',
+        choices=['calplot', 'native'],
+        default='calplot',
+        help='Calendar renderer: calplot figures, or fast NumPy images without text labels (default: calplot)'
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Refresh prepared data and plots, running only stages whose inputs changed.
+
+Stages are the existing prepare, export and plot scripts. Each one runs
+from its own directory with absolute paths, after the stages producing its
+inputs; independent branches (Garmin, Nomie, Toggl) run in parallel.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add parent directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.path_utils import get_project_root, get_raw_data_path, get_data_path
+from utils.pipeline_utils import stage, run_pipeline
+
+
+def build_stages(garmin_path: Path, toggl_path: Path, output_dir: Path, store: Path = None) -> list:
+    """Describe the prepare and plot stages of the project.
+
+    Args:
+        garmin_path: Garmin export directory
+        toggl_path: Directory with Toggl CSV files
+        output_dir: Directory for PNG files
+        store: SQLite daily store the loaders also write to (optional)
+
+    Returns:
+        List of stages for pipeline_utils.run_pipeline
+    """
+    root = get_project_root()
+    garmin_scripts = get_raw_data_path('garmin-export')
+    plot_scripts = root / 'anal' / 'scripts'
+
+    # Every stage imports the shared utils, so changing them reruns it
+    utils = sorted((root / 'anal' / 'utils').glob('*.py'))
+
+    uds_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Aggregator'
+    sleep_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Wellness'
+    fitness_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Fitness'
+
+    garmin_data = get_data_path('my_garmin_data.tsv')
+    garmin_sleep = get_data_path('my_garmin_sleep.tsv')
+    garmin_activities = get_data_path('my_garmin_activities.tsv')
+    garmin_stress = get_data_path('my_garmin_stress.tsv')
+    nomie_db = get_raw_data_path('nomie-export/data/n3-events.v1.0.0.db')
+    nomie_json = get_data_path('my_nomie_events.json')
+    store_args = ['--store', store] if store else []
+
+    def prepare(name, script, output, inputs):
+        return stage(
+            name, garmin_scripts / script,
+            args=['--garmin-path', garmin_path, '--output', output, '--incremental'] + store_args,
+            inputs=inputs + utils,
+            outputs=[output]
+        )
+
+    def plot(name, script, args, inputs, outputs, after=()):
+        return stage(
+            name, plot_scripts / script,
+            args=args,
+            inputs=inputs + utils,
+            outputs=outputs,
+            after=after
+        )
+
+    return [
+        # Garmin branch
+        prepare('garmin-steps', '01-prepare-steps.py', garmin_data, [uds_dir, sleep_dir]),
+        prepare('garmin-sleep', '02-prepare-sleep.py', garmin_sleep, [sleep_dir]),
+        prepare('garmin-activities', '03-prepare-activities.py', garmin_activities, [fitness_dir]),
+        prepare('garmin-stress', '04-prepare-stress.py', garmin_stress, [uds_dir]),
+        # Heart rate files depend on which metrics have data, so none are required
+        plot('plot-heart-rates', '01-plot-heart-rates.py',
+             ['--input', garmin_data, '--output-prefix', output_dir / 'hr'],
+             [garmin_data], [], after=['garmin-steps']),
+        plot('plot-steps', '02-plot-steps.py',
+             ['--input', garmin_data, '--output-calendar', output_dir / 'steps_calendar.png',
+              '--output-bars', output_dir / 'steps_bars.png'],
+             [garmin_data], [output_dir / 'steps_calendar.png', output_dir / 'steps_bars.png'],
+             after=['garmin-steps']),
+        plot('plot-sleep', '05-plot-sleep.py',
+             ['--input', garmin_sleep, '--output-calendar', output_dir / 'sleep_calendar.png',
+              '--output-bars', output_dir / 'sleep_bars.png'],
+             [garmin_sleep], [output_dir / 'sleep_calendar.png', output_dir / 'sleep_bars.png'],
+             after=['garmin-sleep']),
+        plot('plot-activities', '06-plot-activities.py',
+             ['--input', garmin_activities, '--output-calendar', output_dir / 'activities_calendar.png',
+              '--output-bars', output_dir / 'activities_bars.png'],
+             [garmin_activities], [output_dir / 'activities_calendar.png', output_dir / 'activities_bars.png'],
+             after=['garmin-activities']),
+        # The stress bar chart is only written when some day has stress data
+        plot('plot-stress', '07-plot-stress.py',
+             ['--input', garmin_stress, '--output-calendar', output_dir / 'stress_calendar.png',
+              '--output-bars', output_dir / 'stress_bars.png'],
+             [garmin_stress], [output_dir / 'stress_calendar.png'],
+             after=['garmin-stress']),
+        plot('plot-sleep-times', '09-plot-sleep-times.py',
+             ['--input', garmin_data, '--output-bedtime', output_dir / 'bedtime_calendar.png',
+              '--output-waketime', output_dir / 'waketime_calendar.png'],
+             [garmin_data], [output_dir / 'bedtime_calendar.png', output_dir / 'waketime_calendar.png'],
+             after=['garmin-steps']),
+        plot('plot-floors', '10-plot-floors.py',
+             ['--input', garmin_data, '--output', output_dir / 'floors_calendar.png'],
+             [garmin_data], [output_dir / 'floors_calendar.png'],
+             after=['garmin-steps']),
+
+        # Nomie branch
+        stage(
+            'nomie-json', get_raw_data_path('nomie-export/db_to_json.py'),
+            args=['--incremental'],
+            inputs=[nomie_db],
+            outputs=[nomie_json]
+        ),
+        plot('plot-alcohol', '03-alco-data.py',
+             ['--input', nomie_json, '--output', output_dir / 'alcohol_calendar.png'] + store_args,
+             [nomie_json], [output_dir / 'alcohol_calendar.png'],
+             after=['nomie-json']),
+
+        # Toggl branch
+        plot('plot-business-hours', '04-business-hours.py',
+             ['--toggl-path', toggl_path, '--cache-dir', get_data_path('toggl-cache'),
+              '--output', output_dir / 'business_hours_calendar.png'] + store_args,
+             [toggl_path], [output_dir / 'business_hours_calendar.png']),
+    ]
+
+
+def main(args):
+    """Main execution function."""
+    output_dir = Path(args.output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stages = build_stages(
+        Path(args.garmin_path).resolve(),
+        Path(args.toggl_path).resolve(),
+        output_dir,
+        store=Path(args.store).resolve() if args.store else None
+    )
+    results = run_pipeline(
+        stages,
+        Path(args.state),
+        workers=args.jobs,
+        force=args.force,
+        dry_run=args.dry_run,
+        verbose=args.verbose
+    )
+
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    print("Summary: " + ", ".join(f"{count} {result}" for result, count in sorted(counts.items())))
+
+    if 'failed' in counts or 'blocked' in counts:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Refresh prepared data and plots, running only stages whose inputs changed'
+    )
+    parser.add_argument(
+        '--garmin-path',
+        default=str(get_raw_data_path('garmin-export/data')),
+        help='Path to Garmin export directory (default: raw-data/garmin-export/data/)'
+    )
+    parser.add_argument(
+        '--toggl-path',
+        default=str(get_raw_data_path('toggl-export/data')),
+        help='Path to Toggl CSV files (default: raw-data/toggl-export/data/)'
+    )
+    parser.add_argument(
+        '--output-dir',
+        default=str(get_data_path('plots')),
+        help='Directory for PNG files (default: data/plots/)'
+    )
+    parser.add_argument(
+        '--store',
+        help='SQLite daily store the prepare, Nomie and Toggl stages also upsert into (e.g. data/my_daily.db)'
+    )
+    parser.add_argument(
+        '--state',
+        default=str(get_data_path('pipeline-state.json')),
+        help='File recording the inputs each stage last ran with (default: data/pipeline-state.json)'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of stages run in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Run all stages even if their inputs are unchanged'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Only print which stages would run'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print the output of every stage, not only of failed ones'
+    )
+
+    args = parser.parse_args()
+    main(args)
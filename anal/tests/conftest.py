@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# Tests import utils the same way the scripts do
+sys.path.insert(0, str(Path(__file__).parent.parent))
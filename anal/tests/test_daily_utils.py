@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from utils.daily_utils import join_daily, densify
+
+
+def test_join_daily_keeps_last_row_of_repeated_days():
+    steps = pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-01', '2024-01-03', '2024-01-01', '2024-01-05']),
+        'steps_cnt': [100, 300, 150, 500],
+    })
+    sleep = pd.DataFrame({'date': pd.to_datetime(['2024-01-03']), 'sleep_duration_h': [7.5]})
+
+    df = join_daily([steps, sleep], end='2024-01-04')
+
+    assert df['date'].dt.day.tolist() == [1, 2, 3, 4]
+    assert df['steps_cnt'].tolist()[0] == 150
+    assert np.isnan(df['steps_cnt'].iloc[1]) and df['steps_cnt'].iloc[2] == 300
+    assert df['sleep_duration_h'].iloc[2] == 7.5
+
+
+def test_densify_fills_gaps_with_last_row_per_day():
+    counts = pd.DataFrame({
+        'date': pd.to_datetime(['2024-01-01', '2024-01-04', '2024-01-04']),
+        'activity_count': [1, 2, 3],
+    })
+
+    df = densify(counts, fill_value=0)
+
+    assert df['activity_count'].tolist() == [1, 0, 0, 3]
+    assert df['activity_count'].dtype == np.int64
@@ -0,0 +1,41 @@
+import json
+import sqlite3
+
+import pandas as pd
+
+from utils.nomie_utils import load_nomie_data, read_nomie_events
+
+
+EVENTS = [
+    {'id': 'a', 'start': 1660755600000, 'end': 1660755601000, 'notes': '#shot(1.5)'},
+    {'id': 'b', 'start': 1672617600000, 'end': 1672617601000, 'notes': '#beer(1)'},
+]
+
+
+def test_load_nomie_data_json_since(tmp_path):
+    path = tmp_path / 'my_nomie_events.json'
+    path.write_text(json.dumps(EVENTS))
+    watermark = pd.Timestamp('2023-01-01').value // 10**6
+
+    df = load_nomie_data(path, watermark=watermark)
+
+    assert df['id'].tolist() == ['b']
+    assert df['date'].tolist() == [pd.Timestamp('2023-01-02')]
+
+
+def test_read_nomie_events_tagged_only(tmp_path):
+    db_path = tmp_path / 'n3-events.v1.0.0.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE events (id TEXT, start INTEGER, notes TEXT, lat REAL)')
+    conn.executemany('INSERT INTO events VALUES (?, ?, ?, 0)', [
+        ('a', 1, '#beer(1)'), ('b', 2, 'no tags'), ('c', 3, None), ('d', 4, 'x #wine(2) #shot(1)'), ('e', 5, ''),
+    ])
+    conn.commit()
+    conn.close()
+
+    events = read_nomie_events(db_path, chunk_size=2, tagged_only=True)
+
+    assert events['id'].tolist() == ['d', 'a']
+    assert list(events.columns) == ['id', 'start', 'notes']
+    assert read_nomie_events(db_path, chunk_size=2)['id'].tolist() == ['e', 'd', 'c', 'b', 'a']
+    assert read_nomie_events(db_path, watermark=6, tagged_only=True).empty
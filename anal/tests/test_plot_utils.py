@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from utils.plot_utils import METRICS, prepare_activities, prepare_sleep, prepare_stress, year_bin_counts
+from utils.rollup_utils import build_rollup, year_table
+
+
+def _days(column, values):
+    dates = pd.date_range('2023-12-30', periods=len(values), freq='D')
+    return pd.DataFrame({'date': dates, column: values})
+
+
+def _bar_counts(df, name):
+    table = year_bin_counts(df, METRICS[name])
+    rolled = year_table(build_rollup(df, {name: METRICS[name]}), name, len(METRICS[name]['labels']))
+    assert table.equals(rolled)
+    return table.set_index('year').to_numpy().tolist()
+
+
+def test_missing_sleep_duration_counts_in_last_bin():
+    df = prepare_sleep(_days('sleep_duration_h', [6.5, np.nan, 7.0, 8.0, 8.5, np.nan]))
+
+    assert _bar_counts(df, 'sleep') == [[1, 0, 1], [0, 2, 2]]
+
+
+def test_activity_bins():
+    df = prepare_activities(_days('activity_count', [0, np.nan, 0, 1, 2, 3]))
+
+    assert _bar_counts(df, 'activities') == [[1, 0, 1], [1, 2, 1]]
+
+
+def test_missing_stress_level_gets_no_bin():
+    df = prepare_stress(_days('avg_stress_level', [20, np.nan, 30, 50, np.nan, 70]))
+
+    assert _bar_counts(df, 'stress') == [[1, 0, 0, 0], [0, 1, 1, 1]]
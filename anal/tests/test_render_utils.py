@@ -0,0 +1,45 @@
+import os
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from utils.render_utils import CALENDAR_STYLE, calendar_job, prune_render_cache, year_tile_jobs
+
+
+def test_prune_render_cache_keeps_recently_used(tmp_path):
+    (tmp_path / 'tiles').mkdir()
+    paths = [tmp_path / 'old.png', tmp_path / 'tiles' / 'middle.png', tmp_path / 'new.png']
+    for age, path in enumerate(reversed(paths)):
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+
+    assert prune_render_cache(tmp_path, max_bytes=250) == 1
+    assert [path.exists() for path in paths] == [False, True, True]
+    assert prune_render_cache(tmp_path, max_bytes=250) == 0
+
+
+def test_year_tile_jobs_match_calplot_scale():
+    import calplot
+
+    # Mostly zero days like the alcohol counts, so calplot drops the zeros
+    days = pd.date_range('2021-01-01', '2022-12-31', freq='D')
+    counts = np.zeros(len(days), dtype=np.int64)
+    counts[::9] = 1
+    counts[::40] = 4
+    series = pd.Series(counts, index=days)
+
+    fig, axes = calplot.calplot(series, cmap='viridis', **CALENDAR_STYLE)
+    vmin, vmax = axes[0].get_children()[1].get_clim()
+    colorbar = len(fig.axes) > len(axes)
+    plt.close(fig)
+
+    tiles = year_tile_jobs(calendar_job(series, plt.get_cmap('viridis')))
+
+    assert [tile['name'] for tile in tiles] == ['calendar plot 2021', 'calendar plot 2022']
+    for tile in tiles:
+        assert (tile['vmin'], tile['vmax'], tile['colorbar']) == (vmin, vmax, colorbar)
+        assert tile['dropzero'] is True
+    assert (vmin, vmax) == (1, 4)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from utils.garmin_utils import load_garmin_uds, load_garmin_steps, load_garmin_stress, STEPS_COLUMNS, STRESS_COLUMNS
+from utils.plot_utils import METRICS, write_rollups
+from utils.rollup_utils import changed_months, read_rollup, build_rollup
+
+
+def _stress_days(start, periods):
+    dates = pd.date_range(start, periods=periods, freq='D')
+    levels = np.linspace(10, 80, periods)
+    return pd.DataFrame({'date': dates, 'avg_stress_level': levels, 'max_stress_level': levels + 10})
+
+
+def test_loaders_without_data_keep_columns(tmp_path):
+    uds = load_garmin_uds(tmp_path, files=[])
+
+    assert list(load_garmin_steps(tmp_path, uds=uds).columns) == STEPS_COLUMNS
+    assert list(load_garmin_stress(tmp_path, uds=uds).columns) == STRESS_COLUMNS
+
+
+def test_changed_months_without_new_rows():
+    df = _stress_days('2024-01-01', 60)
+
+    assert len(changed_months(df, df, pd.DataFrame())) == 0
+    assert len(changed_months(df, df, df.iloc[:0])) == 0
+
+
+def test_incremental_rollup_without_new_stress_data(tmp_path):
+    output_path = tmp_path / 'my_garmin_stress.tsv'
+    df = _stress_days('2024-01-01', 60)
+    df.to_csv(output_path, sep='\t', index=False)
+    write_rollups(df, 'stress', output_path)
+
+    # Only sleep files changed: the stress loader finds no new rows
+    rollup = write_rollups(df, 'stress', output_path, previous=df, new=pd.DataFrame())
+
+    expected = build_rollup(df, {'stress': METRICS['stress']})
+    assert rollup.equals(expected)
+    assert read_rollup(output_path) is not None
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from utils.toggl_utils import parse_duration, parse_durations, load_toggl_hours
+
+
+HEADER = 'User,Email,Client,Project,Task,Description,Billable,Start date,Start time,End date,End time,Duration,Tags,Amount ()\n'
+
+
+def _write_export(path, rows):
+    lines = [f'me,a@b,{client},p,,d,No,{day},10:00:00,{day},11:00:00,{duration},,\n' for client, day, duration in rows]
+    path.write_text(HEADER + ''.join(lines))
+
+
+def test_parse_durations_matches_parse_duration():
+    durations = pd.Series(['05:45:42', '00:00:00', '123:01:59'])
+
+    assert parse_durations(durations).tolist() == [parse_duration(each) for each in durations]
+
+
+def test_parse_durations_empty():
+    hours = parse_durations(pd.Series([], dtype=str))
+
+    assert hours.empty
+    assert hours.dtype == float
+
+
+def test_load_toggl_hours_with_filtered_out_file(tmp_path):
+    _write_export(tmp_path / 'Toggl_time_entries_2020.csv', [('acme', '2020-01-23', '05:45:42')])
+    # Nothing left after the client filter
+    _write_export(tmp_path / 'Toggl_time_entries_2021.csv', [('other', '2021-01-24', '02:17:42')])
+
+    hours = load_toggl_hours(tmp_path, clients_include=['acme'])
+
+    assert hours['date'].tolist() == [pd.Timestamp('2020-01-23')]
+    assert hours['duration_h'].tolist() == [parse_duration('05:45:42')]
@@ -0,0 +1,105 @@
+import os
+import pickle
+from pathlib import Path
+import pandas as pd
+
+
+# Bump when the layout of cached frames changes to invalidate old caches
+CACHE_SCHEMA_VERSION = 1
+
+
+def cache_path_for(tsv_path: Path) -> Path:
+    """Get path of the binary cache stored next to a prepared TSV.
+
+    Args:
+        tsv_path: Prepared TSV, e.g. data/my_garmin_data.tsv
+
+    Returns:
+        Path like data/my_garmin_data.pkl
+    """
+    return Path(tsv_path).with_suffix('.pkl')
+
+
+def _tsv_signature(tsv_path: Path) -> dict:
+    """Size and mtime of the TSV the cache was written with."""
+    stat = os.stat(tsv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def write_frame(df: pd.DataFrame, tsv_path: Path):
+    """Write a prepared dataset as TSV plus a typed binary cache.
+
+    The TSV stays the human-readable source of truth; the cache keeps
+    dtypes (datetime64 dates, typed numbers) so readers skip parsing.
+
+    Args:
+        df: Prepared DataFrame
+        tsv_path: Output TSV path
+    """
+    tsv_path = Path(tsv_path)
+    tsv_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(tsv_path, sep='\t', index=False)
+
+    payload = {
+        'schema_version': CACHE_SCHEMA_VERSION,
+        'tsv': _tsv_signature(tsv_path),
+        'frame': df,
+    }
+    with open(cache_path_for(tsv_path), 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_cached_frame(tsv_path: Path):
+    """Load the binary cache of a TSV if it is still valid.
+
+    Args:
+        tsv_path: Prepared TSV path
+
+    Returns:
+        Cached DataFrame, or None when the cache is missing, was written by
+        another schema version or the TSV changed since it was written
+    """
+    tsv_path = Path(tsv_path)
+    cache_path = cache_path_for(tsv_path)
+    if not cache_path.exists() or not tsv_path.exists():
+        return None
+
+    try:
+        with open(cache_path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:
+        # Unreadable or written by an incompatible pandas version
+        return None
+
+    if payload.get('schema_version') != CACHE_SCHEMA_VERSION:
+        return None
+    if payload.get('tsv') != _tsv_signature(tsv_path):
+        return None
+
+    return payload['frame']
+
+
+def read_frame(tsv_path: Path, parse_dates: list = None) -> pd.DataFrame:
+    """Read a prepared dataset, preferring its binary cache over the TSV.
+
+    Args:
+        tsv_path: Prepared TSV path
+        parse_dates: Columns to return as datetime64
+
+    Returns:
+        DataFrame
+    """
+    parse_dates = parse_dates or []
+
+    df = load_cached_frame(tsv_path)
+    if df is None:
+        # Only parse date columns the file actually has
+        header = pd.read_csv(tsv_path, sep='\t', nrows=0).columns
+        return pd.read_csv(tsv_path, sep='\t', parse_dates=[c for c in parse_dates if c in header])
+
+    # Cached columns are normally typed already; this only converts leftovers
+    for column in parse_dates:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+
+    return df
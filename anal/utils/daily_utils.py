@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+
+# Resolution of the 'date' column of aligned tables, as pandas uses for parsed dates
+DATE_DTYPE = 'datetime64[us]'
+
+
+def day_numbers(dates) -> np.ndarray:
+    """Convert dates to int32 day numbers (days since 1970-01-01).
+
+    Accepts datetime64 values of any resolution, Timestamps, Python date
+    and datetime objects or date strings. Times of day are floored, so
+    floored and unfloored datetimes of the same day get the same number.
+
+    Args:
+        dates: Series, Index or array of dates
+
+    Returns:
+        int32 array
+
+    Raises:
+        ValueError: If a date is missing
+    """
+    values = np.asarray(dates)
+    if values.dtype.kind != 'M':
+        parsed = pd.to_datetime(pd.Series(values))
+        if parsed.dt.tz is not None:
+            # Day of the local wall-clock time
+            parsed = parsed.dt.tz_localize(None)
+        values = parsed.to_numpy()
+
+    # datetime64 to day resolution floors, also before 1970
+    days = values.astype('datetime64[D]').view(np.int64)
+    if np.isnat(values).any():
+        raise ValueError("Dates must not be missing")
+    return days.astype(np.int32)
+
+
+def day_dates(days: np.ndarray) -> pd.DatetimeIndex:
+    """Convert int32 day numbers back to dates.
+
+    Args:
+        days: Array of day numbers
+
+    Returns:
+        DatetimeIndex at midnight of each day
+    """
+    return pd.DatetimeIndex(np.asarray(days, dtype=np.int64).astype('datetime64[D]').astype(DATE_DTYPE))
+
+
+def _dense_column(values, offsets: np.ndarray, length: int, complete: bool, fill_value=None) -> np.ndarray:
+    """Scatter one column into an array with a slot per day.
+
+    Numeric columns keep their dtype when every day gets a value or the
+    fill value fits it, and become floats otherwise; datetime columns keep
+    theirs with NaT for missing days; anything else becomes an object array
+    with NaN.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+
+    if fill_value is not None and kind in 'iubf':
+        dense = np.full(length, fill_value, dtype=np.result_type(values.dtype, np.min_scalar_type(fill_value)))
+    elif kind == 'M' or kind == 'm':
+        dense = np.full(length, np.datetime64('NaT') if kind == 'M' else np.timedelta64('NaT'), dtype=values.dtype)
+    elif kind == 'f':
+        dense = np.full(length, np.nan, dtype=values.dtype)
+    elif kind in 'iub' and complete:
+        dense = np.zeros(length, dtype=values.dtype)
+    elif kind in 'iub':
+        dense = np.full(length, np.nan)
+    else:
+        dense = np.full(length, np.nan, dtype=object)
+
+    dense[offsets] = values
+    return dense
+
+
+def join_daily(frames: list, start=None, end=None, dense: bool = True, fill_value=None) -> pd.DataFrame:
+    """Align daily DataFrames from several sources on one day-number axis.
+
+    Each frame's dates become offsets into a single range of days, and its
+    columns are scattered into preallocated arrays of that length. This is
+    O(rows + days) with no hashing, sorting or merging of keys; only frames
+    repeating a day are sorted to find their last rows.
+
+    Args:
+        frames: DataFrames with a 'date' column; other column names must be
+            unique across frames. When a frame has several rows for a day,
+            its last row wins, as in manifest_utils.merge_by_date
+        start: First day of the result (default: earliest date of any frame)
+        end: Last day of the result (default: latest date of any frame);
+            rows outside [start, end] are dropped
+        dense: Include every day in the range; otherwise only days present
+            in at least one frame, like an outer merge on 'date'
+        fill_value: Value of numeric columns on days a frame has no row for
+            (default: NaN)
+
+    Returns:
+        DataFrame with a 'date' column and the columns of all frames, sorted by date
+
+    Raises:
+        ValueError: If two frames share a column name
+    """
+    days = [day_numbers(frame['date']) for frame in frames]
+
+    columns = [column for frame in frames for column in frame.columns if column != 'date']
+    duplicated = sorted({column for column in columns if columns.count(column) > 1})
+    if duplicated:
+        raise ValueError(f"Columns in several frames: {', '.join(duplicated)}")
+
+    non_empty = [frame_days for frame_days in days if len(frame_days)]
+    first = day_numbers([start])[0] if start is not None else min((d.min() for d in non_empty), default=0)
+    last = day_numbers([end])[0] if end is not None else max((d.max() for d in non_empty), default=-1)
+    length = max(int(last) - int(first) + 1, 0)
+
+    # First pass: rows and offsets of each frame and the days any frame covers
+    present = np.zeros(length, dtype=bool)
+    placements = []
+    for frame, frame_days in zip(frames, days):
+        offsets = frame_days.astype(np.int64) - first
+        in_range = (offsets >= 0) & (offsets < length)
+        rows = None if in_range.all() else np.flatnonzero(in_range)
+        if rows is not None:
+            offsets = offsets[rows]
+
+        counts = np.bincount(offsets, minlength=length)
+        if (counts > 1).any():
+            # Keep the last row of each day: first occurrence in reversed order
+            _, reversed_index = np.unique(offsets[::-1], return_index=True)
+            last_rows = np.sort(len(offsets) - 1 - reversed_index)
+            rows = last_rows if rows is None else rows[last_rows]
+            offsets = offsets[last_rows]
+            counts = np.minimum(counts, 1)
+
+        placements.append((rows, offsets, counts > 0))
+        present |= counts > 0
+
+    keep = None if dense else np.flatnonzero(present)
+
+    # Second pass: scatter every column and keep the requested days
+    columns = {'date': day_dates(first + (np.arange(length) if keep is None else keep))}
+    for frame, (rows, offsets, frame_present) in zip(frames, placements):
+        complete = bool(frame_present.all() if keep is None else frame_present[keep].all())
+        for column in frame.columns:
+            if column != 'date':
+                values = frame[column].to_numpy()
+                values = _dense_column(
+                    values if rows is None else values[rows], offsets, length, complete, fill_value
+                )
+                columns[column] = values if keep is None else values[keep]
+    return pd.DataFrame(columns)
+
+
+def densify(df: pd.DataFrame, fill_value=None) -> pd.DataFrame:
+    """Add a row for every missing day between the first and last date.
+
+    Rows are scattered into arrays with one slot per day, so filling gaps
+    is O(rows + days) instead of a merge against a table of all dates.
+
+    Args:
+        df: DataFrame with a 'date' column; of several rows for a day the
+            last one is kept
+        fill_value: Value of numeric columns on added days, e.g. 0 for
+            counts (default: NaN)
+
+    Returns:
+        DataFrame covering every day in the date range, sorted by date
+    """
+    if df.empty:
+        return df
+    dense = join_daily([df], fill_value=fill_value)
+    # Keep the resolution of the input dates
+    if df['date'].dtype.kind == 'M' and df['date'].dtype != dense['date'].dtype:
+        dense['date'] = dense['date'].astype(df['date'].dtype)
+    return dense
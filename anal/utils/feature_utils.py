@@ -0,0 +1,127 @@
+import operator
+import numpy as np
+import pandas as pd
+
+
+# Comparison operators usable in bin tests
+BIN_OPERATORS = {
+    '==': operator.eq,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+# Nanoseconds per minute, for decimal hours from datetime64 values
+NS_PER_MINUTE = 60 * 10**9
+
+
+def rounded(values: pd.Series, divisor: float = 1, integer: bool = False) -> pd.Series:
+    """Divide and round values to the nearest whole number, halves to even.
+
+    Gives the same numbers as Python's round(value / divisor) and
+    Series.round(), computed with one array operation.
+
+    Args:
+        values: Numeric Series
+        divisor: Divide values by this before rounding, e.g. 1000 for thousands
+        integer: Return int64 like Python's round() when no value is missing
+
+    Returns:
+        Series of rounded values (float64 with NaN for missing values, or int64)
+    """
+    array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if divisor != 1:
+        array = array / divisor
+    result = np.round(array)
+
+    if integer and not np.isnan(result).any():
+        result = result.astype(np.int64)
+    return pd.Series(result, index=values.index)
+
+
+def categorize(values: pd.Series, bins: list, missing_last: bool = False) -> pd.Series:
+    """Assign each value to a bin with array comparisons.
+
+    Args:
+        values: Numeric Series
+        bins: List of (operator, edge) tests; the first passing test gives
+            the bin, values passing none get the last bin
+        missing_last: Put missing values in the last bin, as values passing
+            no test, instead of leaving them without a bin
+
+    Returns:
+        Series of bin numbers starting at 1 (nullable Int64, NA for missing
+        values unless missing_last)
+    """
+    array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    categories = np.full(len(array), len(bins) + 1, dtype=np.int64)
+
+    # Apply tests from last to first so the first passing test wins
+    for position in range(len(bins) - 1, -1, -1):
+        op, edge = bins[position]
+        categories[BIN_OPERATORS[op](array, edge)] = position + 1
+
+    return pd.Series(
+        pd.arrays.IntegerArray(categories, np.isnan(array) & (not missing_last)),
+        index=values.index
+    )
+
+
+def year(dates: pd.Series) -> pd.Series:
+    """Get the calendar year of each date.
+
+    Args:
+        dates: Series of datetimes or date strings
+
+    Returns:
+        Series of int64 years (float64 with NaN when a date is missing)
+    """
+    years = pd.DatetimeIndex(dates).year
+    if years.dtype.kind == 'i':
+        years = years.astype(np.int64)
+    return pd.Series(np.asarray(years), index=dates.index)
+
+
+def hour_decimal(times: pd.Series) -> pd.Series:
+    """Get the time of day as decimal hours.
+
+    Minutes of the day come from one integer division of the datetime64
+    values; the result equals dt.hour + dt.minute / 60.0.
+
+    Args:
+        times: Series of datetimes
+
+    Returns:
+        Series with hours as decimals (e.g., 22.5 for 22:30), NaN for missing times
+    """
+    stamps = pd.DatetimeIndex(times).as_unit('ns')
+    minutes = stamps.asi8 // NS_PER_MINUTE % (24 * 60)
+
+    result = (minutes // 60) + (minutes % 60) / 60.0
+    result[stamps.isna()] = np.nan
+    return pd.Series(result, index=times.index)
+
+
+# Feature kinds usable in derive_features
+FEATURE_FUNCTIONS = {
+    'round': rounded,
+    'bins': categorize,
+    'year': year,
+    'hour': hour_decimal,
+}
+
+
+def derive_features(df: pd.DataFrame, features: list) -> pd.DataFrame:
+    """Add derived columns to a copy of a DataFrame.
+
+    Args:
+        df: Source DataFrame
+        features: List of (column, kind, source column, keyword arguments),
+            where kind is a key of FEATURE_FUNCTIONS
+
+    Returns:
+        DataFrame with the derived columns added in order
+    """
+    df = df.copy()
+    for column, kind, source, kwargs in features:
+        df[column] = FEATURE_FUNCTIONS[kind](df[source], **kwargs)
+    return df
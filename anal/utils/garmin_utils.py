@@ -1,200 +1,512 @@
 import json
 import os
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from datetime import date as date_type
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from dateutil.tz import tzlocal
+
+
+# Daily fields extracted from each UDSFile record: (column, UDS key, dtype)
+UDS_FIELDS = [
+    ('steps_cnt', 'totalSteps', np.int32),
+    ('min_hr', 'minHeartRate', np.float32),
+    ('min_avg_hr', 'minAvgHeartRate', np.float32),
+    ('max_avg_hr', 'maxAvgHeartRate', np.float32),
+    ('max_hr', 'maxHeartRate', np.float32),
+    ('resting_hr', 'restingHeartRate', np.float32),
+    ('floors_ascended_m', 'floorsAscendedInMeters', np.float64),
+]
+
+# Column buffers filled per file: (column, dtype). Dates and timestamps are
+# collected raw (strings / epoch ms) and converted once per column afterwards.
+UDS_SCHEMA = [('date', object)] + [(column, dtype) for column, _, dtype in UDS_FIELDS] + [
+    ('has_stress', np.bool_),
+    ('avg_stress_level', np.float32),
+    ('max_stress_level', np.float32),
+]
+SLEEP_SCHEMA = [
+    ('date', object),
+    ('sleep_start', object),
+    ('sleep_end', object),
+]
+ACTIVITIES_SCHEMA = [
+    ('date', np.int64),
+    ('activity_type', object),
+    ('sport_type', object),
+    ('duration_m', np.float64),
+    ('calories', np.float64),
+]
+
+STEPS_COLUMNS = ['date'] + [column for column, _, _ in UDS_FIELDS]
+STRESS_COLUMNS = ['date', 'avg_stress_level', 'max_stress_level']
+
+# Timezone transition date (moved from Moscow to DC)
+TRANSITION_DATE = date_type(2022, 1, 5)
+MOSCOW_OFFSET = 3  # UTC+3
+DC_OFFSET = -5     # UTC-5 (US Eastern)
+
+
+def list_uds_files(garmin_path: Path) -> list:
+    """List UDSFile JSON files in date order.
 
+    Args:
+        garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Aggregator
+
+    Returns:
+        Sorted list of full file paths
+    """
+    uds_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Aggregator'
+
+    return sorted([
+        os.path.join(uds_data_dir, f) for f in os.listdir(uds_data_dir)
+        if os.path.isfile(os.path.join(uds_data_dir, f)) and f.startswith('UDSFile')
+    ])
+
+
+def list_sleep_files(garmin_path: Path) -> list:
+    """List sleepData JSON files in date order.
+
+    Args:
+        garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Wellness
+
+    Returns:
+        Sorted list of full file paths
+    """
+    sleep_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Wellness'
+
+    return sorted([
+        os.path.join(sleep_data_dir, f) for f in os.listdir(sleep_data_dir) if 'sleepData' in f
+    ])
+
+
+def list_activity_files(garmin_path: Path) -> list:
+    """List summarizedActivities JSON files.
+
+    Args:
+        garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Fitness
+
+    Returns:
+        Sorted list of full file paths
+    """
+    fitness_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Fitness'
+
+    return sorted([
+        os.path.join(fitness_data_dir, f) for f in os.listdir(fitness_data_dir)
+        if 'summarizedActivities' in f and f.endswith('.json')
+    ])
+
+
+def _map_files(parse_file, file_paths: list, workers: int = None) -> list:
+    """Parse files serially or across a process pool, keeping input order.
+
+    Args:
+        parse_file: Module-level function taking a file path and returning column buffers
+        file_paths: Files to parse (already sorted in date order)
+        workers: Number of worker processes (None or 1 parses in this process)
+
+    Returns:
+        List with the parse result of each file, in the order of file_paths
+    """
+    if workers and workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+            return list(executor.map(parse_file, file_paths))
+
+    return [parse_file(each_file) for each_file in file_paths]
+
+
+def _iter_json_array(json_file, key: str = None, chunk_size: int = 1 << 16):
+    """Yield the elements of a JSON array one at a time.
+
+    Only the current element and one read chunk are held in memory, instead
+    of the whole document tree that json.load builds.
+
+    Args:
+        json_file: Open text file
+        key: Stream the array stored under this object key (first occurrence,
+             e.g. 'summarizedActivitiesExport'); default streams the top-level array
+        chunk_size: Characters read per refill
+
+    Yields:
+        Decoded array elements
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+
+    def refill():
+        nonlocal buffer, position, eof
+        chunk = json_file.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    # Find the opening bracket of the array
+    marker = '[' if key is None else f'"{key}"'
+    while True:
+        found = buffer.find(marker, position)
+        if found >= 0:
+            position = found + len(marker)
+            break
+        if eof:
+            return
+        # Keep a tail in case the marker spans two chunks
+        position = max(position, len(buffer) - len(marker))
+        refill()
+    if key is not None:
+        while True:
+            found = buffer.find('[', position)
+            if found >= 0:
+                position = found + 1
+                break
+            if eof:
+                return
+            position = len(buffer)
+            refill()
+
+    while True:
+        # Skip whitespace and separators between elements
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position >= len(buffer):
+            if eof:
+                raise ValueError('Unterminated JSON array')
+            refill()
+            continue
+        if buffer[position] == ']':
+            return
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            refill()
+            continue
+        if end == len(buffer) and not eof:
+            # The element may continue in the next chunk (e.g. a split number)
+            refill()
+            continue
+
+        position = end
+        yield element
+
+
+def _read_records(file_path: str, stream: bool = False, key: str = None) -> tuple:
+    """Open a Garmin JSON export and return its records.
 
-def load_garmin_steps(garmin_path: Path) -> pd.DataFrame:
+    Args:
+        file_path: JSON file containing an array of records
+        stream: Decode records one at a time instead of loading the whole file
+        key: Records live in the array under this key of the first element
+
+    Returns:
+        Tuple of (records iterable, record count or None when streaming)
+    """
+    if stream:
+        def records():
+            with open(file_path) as json_file:
+                yield from _iter_json_array(json_file, key=key)
+        return records(), None
+
+    with open(file_path) as json_file:
+        data = json.load(json_file)
+    if key is not None:
+        data = data[0].get(key, []) if data else []
+    return data, len(data)
+
+
+def _new_buffers(schema: list, size: int) -> dict:
+    """Preallocate one typed array per column plus a missing-value mask.
+
+    Args:
+        schema: List of (column, dtype)
+        size: Number of records
+
+    Returns:
+        Dict with 'size', 'columns' (column -> array) and 'missing' (column -> bool array)
+    """
+    return {
+        'size': size,
+        'columns': {column: np.zeros(size, dtype=dtype) for column, dtype in schema},
+        'missing': {column: np.zeros(size, dtype=bool) for column, _ in schema},
+    }
+
+
+def _reserve(buffers: dict, i: int) -> dict:
+    """Make sure slot i exists, doubling the buffers when streaming."""
+    if i < buffers['size']:
+        return buffers
+
+    size = max(2 * buffers['size'], 1024)
+    grown = {'size': size, 'columns': {}, 'missing': {}}
+    for column, values in buffers['columns'].items():
+        grown['columns'][column] = np.zeros(size, dtype=values.dtype)
+        grown['columns'][column][:buffers['size']] = values
+        grown['missing'][column] = np.zeros(size, dtype=bool)
+        grown['missing'][column][:buffers['size']] = buffers['missing'][column]
+    return grown
+
+
+def _set_value(buffers: dict, column: str, i: int, value):
+    """Store a record value, marking None as missing."""
+    if value is None:
+        buffers['missing'][column][i] = True
+    else:
+        buffers['columns'][column][i] = value
+
+
+def _truncate_buffers(buffers: dict, size: int) -> dict:
+    """Drop unused tail slots after records were skipped."""
+    return {
+        'size': size,
+        'columns': {column: values[:size] for column, values in buffers['columns'].items()},
+        'missing': {column: mask[:size] for column, mask in buffers['missing'].items()},
+    }
+
+
+def _buffers_to_frame(per_file: list, schema: list) -> pd.DataFrame:
+    """Concatenate per-file column buffers into a DataFrame.
+
+    Missing values become NaN/NaT; integer columns with gaps are widened to
+    float64, which is what pandas infers from the equivalent list of dicts.
+
+    Args:
+        per_file: Buffers returned by the per-file parsers
+        schema: List of (column, dtype)
+
+    Returns:
+        DataFrame with one column per schema entry
+    """
+    data = {}
+    for column, dtype in schema:
+        values = np.concatenate([buffers['columns'][column] for buffers in per_file]) \
+            if per_file else np.zeros(0, dtype=dtype)
+        missing = np.concatenate([buffers['missing'][column] for buffers in per_file]) \
+            if per_file else np.zeros(0, dtype=bool)
+
+        if missing.any():
+            if values.dtype.kind in 'iub':
+                values = values.astype(np.float64)
+            if values.dtype.kind == 'O':
+                values[missing] = None
+            elif values.dtype.kind == 'M':
+                values[missing] = np.datetime64('NaT')
+            else:
+                values[missing] = np.nan
+        data[column] = values
+
+    return pd.DataFrame(data, columns=[column for column, _ in schema])
+
+
+def _parse_uds_file(file_path: str, stream: bool = False) -> dict:
+    """Extract daily column buffers from a single UDSFile."""
+    records, size = _read_records(file_path, stream)
+
+    buffers = _new_buffers(UDS_SCHEMA, size or 0)
+    count = 0
+    for i, each_item in enumerate(records):
+        buffers = _reserve(buffers, i)
+        columns = buffers['columns']
+        columns['date'][i] = each_item['calendarDate']
+        for column, key, _ in UDS_FIELDS:
+            _set_value(buffers, column, i, each_item.get(key))
+
+        # Extract stress data from allDayStress field (TOTAL aggregator)
+        total_stress = None
+        stress_data = each_item.get('allDayStress')
+        if stress_data and 'aggregatorList' in stress_data:
+            total_stress = next(
+                (agg for agg in stress_data['aggregatorList'] if agg.get('type') == 'TOTAL'),
+                None
+            )
+        columns['has_stress'][i] = bool(total_stress)
+        _set_value(buffers, 'avg_stress_level', i, total_stress.get('averageStressLevel') if total_stress else None)
+        _set_value(buffers, 'max_stress_level', i, total_stress.get('maxStressLevel') if total_stress else None)
+        count += 1
+
+    return _truncate_buffers(buffers, count)
+
+
+def _parse_sleep_file(file_path: str, stream: bool = False) -> dict:
+    """Extract raw sleep column buffers (GMT timestamps) from a single sleepData file."""
+    records, size = _read_records(file_path, stream)
+
+    buffers = _new_buffers(SLEEP_SCHEMA, size or 0)
+    count = 0
+    for i, each_item in enumerate(records):
+        buffers = _reserve(buffers, i)
+        columns = buffers['columns']
+        columns['date'][i] = each_item['calendarDate']
+        columns['sleep_start'][i] = each_item['sleepStartTimestampGMT']
+        columns['sleep_end'][i] = each_item['sleepEndTimestampGMT']
+        count += 1
+
+    return _truncate_buffers(buffers, count)
+
+
+def _parse_activities_file(file_path: str, stream: bool = False) -> dict:
+    """Extract activity column buffers from a single summarizedActivities file."""
+    # Extract activities from the nested structure
+    activities, size_hint = _read_records(file_path, stream, key='summarizedActivitiesExport')
+
+    buffers = _new_buffers(ACTIVITIES_SCHEMA, size_hint or 0)
+    size = 0
+    for activity in activities:
+        # Parse start time to get date
+        start_timestamp = activity.get('startTimeGmt', activity.get('beginTimestamp'))
+        if start_timestamp:
+            buffers = _reserve(buffers, size)
+            columns = buffers['columns']
+            columns['date'][size] = start_timestamp
+            columns['activity_type'][size] = activity.get('activityType', 'unknown')
+            columns['sport_type'][size] = activity.get('sportType', 'unknown')
+            columns['duration_m'][size] = activity.get('duration', 0) / 60000  # Convert ms to minutes
+            _set_value(buffers, 'calories', size, activity.get('calories', 0))
+            size += 1
+
+    return _truncate_buffers(buffers, size)
+
+
+def load_garmin_uds(garmin_path: Path, workers: int = None, files: list = None,
+                    stream: bool = False) -> pd.DataFrame:
+    """Load every daily field from UDSFile JSON files in a single pass.
+
+    Steps, heart rate, floors and the allDayStress TOTAL aggregator all live
+    in the same UDSFile records, so they are extracted together and the files
+    are parsed only once. Use load_garmin_steps / load_garmin_stress with
+    uds= to select the columns each dataset needs.
+
+    Args:
+        garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Aggregator
+        workers: Number of processes to parse files with (default: serial)
+        files: Explicit UDSFile paths to parse, e.g. only new ones (default: all)
+        stream: Decode records one at a time to bound memory by record size
+
+    Returns:
+        DataFrame with columns: date, steps_cnt, min_hr, min_avg_hr, max_avg_hr,
+                                max_hr, resting_hr, floors_ascended_m,
+                                has_stress, avg_stress_level, max_stress_level
+        Dates are datetime64, steps int32 (float64 if any day lacks them),
+        heart rate and stress float32.
+    """
+    if files is None:
+        files = list_uds_files(garmin_path)
+    per_file = _map_files(partial(_parse_uds_file, stream=stream), files, workers)
+
+    df = _buffers_to_frame(per_file, UDS_SCHEMA)
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    return df
+
+
+def load_garmin_steps(garmin_path: Path, uds: pd.DataFrame = None, workers: int = None,
+                      stream: bool = False) -> pd.DataFrame:
     """Load Garmin steps data from UDSFile JSON files.
 
     Args:
         garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Aggregator
+        uds: Result of load_garmin_uds to reuse instead of re-reading the files (optional)
+        workers: Number of processes to parse files with (default: serial)
+        stream: Decode records one at a time to bound memory by record size
 
     Returns:
         DataFrame with columns: date, steps_cnt, min_hr, min_avg_hr,
                                 max_avg_hr, max_hr, resting_hr, floors_ascended_m
     """
-    steps_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Aggregator'
+    if uds is None:
+        uds = load_garmin_uds(garmin_path, workers=workers, stream=stream)
+
+    # An empty UDS frame still has every column, so no data gives an empty frame with them
+    return uds[STEPS_COLUMNS].reset_index(drop=True)
 
-    uds_files = sorted([
-        f for f in os.listdir(steps_data_dir)
-        if os.path.isfile(os.path.join(steps_data_dir, f)) and f.startswith('UDSFile')
-    ])
 
-    my_data = []
-    for each_file in uds_files:
-        with open(os.path.join(steps_data_dir, each_file)) as json_file:
-            data = json.load(json_file)
-            for each_item in data:
-                date_of_measurment = datetime.strptime(
-                    each_item['calendarDate'],
-                    '%Y-%m-%d'
-                ).date()
-                new_row = {
-                    'date': date_of_measurment,
-                    'steps_cnt': each_item.get('totalSteps'),
-                    'min_hr': each_item.get('minHeartRate'),
-                    'min_avg_hr': each_item.get('minAvgHeartRate'),
-                    'max_avg_hr': each_item.get('maxAvgHeartRate'),
-                    'max_hr': each_item.get('maxHeartRate'),
-                    'resting_hr': each_item.get('restingHeartRate'),
-                    'floors_ascended_m': each_item.get('floorsAscendedInMeters')
-                }
-                my_data.append(new_row)
-
-    return pd.DataFrame(my_data)
-
-
-def load_garmin_sleep(garmin_path: Path, timezone_offset_hours: int = -5) -> pd.DataFrame:
+def load_garmin_sleep(garmin_path: Path, timezone_offset_hours: int = -5, workers: int = None,
+                      files: list = None, stream: bool = False) -> pd.DataFrame:
     """Load Garmin sleep data from sleepData JSON files.
 
     Args:
         garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Wellness
         timezone_offset_hours: Timezone offset from GMT (default: -5 for US Eastern)
                                Use None to auto-detect based on date (Moscow +3 before 2022-01-05, DC -5 after)
+        workers: Number of processes to parse files with (default: serial)
+        files: Explicit sleepData paths to parse, e.g. only new ones (default: all)
+        stream: Decode records one at a time to bound memory by record size
 
     Returns:
         DataFrame with columns: date, sleep_start, sleep_end (in local time)
     """
-    from datetime import timedelta, date as date_type
+    if files is None:
+        files = list_sleep_files(garmin_path)
+    per_file = _map_files(partial(_parse_sleep_file, stream=stream), files, workers)
 
-    sleep_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Wellness'
+    df = _buffers_to_frame(per_file, SLEEP_SCHEMA)
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
 
-    sleep_files = sorted([
-        f for f in os.listdir(sleep_data_dir) if 'sleepData' in f
-    ])
+    # Determine timezone offset
+    if timezone_offset_hours is None:
+        # Auto-detect based on date
+        offset_hours = np.where(df['date'] < pd.Timestamp(TRANSITION_DATE), MOSCOW_OFFSET, DC_OFFSET)
+    else:
+        offset_hours = timezone_offset_hours
+    offset = np.asarray(offset_hours).astype('timedelta64[h]')
+
+    # Parse GMT timestamps and apply timezone offset to convert to local time
+    for column in ['sleep_start', 'sleep_end']:
+        df[column] = pd.to_datetime(df[column], format='%Y-%m-%dT%H:%M:%S.0') + offset
+
+    return df
 
-    # Timezone transition date (moved from Moscow to DC)
-    TRANSITION_DATE = date_type(2022, 1, 5)
-    MOSCOW_OFFSET = 3  # UTC+3
-    DC_OFFSET = -5     # UTC-5 (US Eastern)
-
-    my_data = []
-    for each_file in sleep_files:
-        with open(os.path.join(sleep_data_dir, each_file)) as json_file:
-            data = json.load(json_file)
-            for each_item in data:
-                date_of_measurment = datetime.strptime(
-                    each_item['calendarDate'],
-                    '%Y-%m-%d'
-                ).date()
-
-                # Parse GMT timestamps and convert to local time
-                start_of_sleep_gmt = datetime.strptime(
-                    each_item['sleepStartTimestampGMT'],
-                    '%Y-%m-%dT%H:%M:%S.0'
-                )
-                end_of_sleep_gmt = datetime.strptime(
-                    each_item['sleepEndTimestampGMT'],
-                    '%Y-%m-%dT%H:%M:%S.0'
-                )
-
-                # Determine timezone offset
-                if timezone_offset_hours is None:
-                    # Auto-detect based on date
-                    offset = MOSCOW_OFFSET if date_of_measurment < TRANSITION_DATE else DC_OFFSET
-                else:
-                    offset = timezone_offset_hours
-
-                # Apply timezone offset to convert to local time
-                start_of_sleep = start_of_sleep_gmt + timedelta(hours=offset)
-                end_of_sleep = end_of_sleep_gmt + timedelta(hours=offset)
-
-                new_row = {
-                    'date': date_of_measurment,
-                    'sleep_start': start_of_sleep,
-                    'sleep_end': end_of_sleep
-                }
-                my_data.append(new_row)
-
-    return pd.DataFrame(my_data)
-
-
-def load_garmin_activities(garmin_path: Path) -> pd.DataFrame:
+
+def load_garmin_activities(garmin_path: Path, workers: int = None, stream: bool = False) -> pd.DataFrame:
     """Load Garmin activities data from summarizedActivities JSON file.
 
     Args:
         garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Fitness
+        workers: Number of processes to parse files with (default: serial)
+        stream: Decode activities one at a time instead of loading the whole file
 
     Returns:
         DataFrame with columns: date, activity_type, sport_type, duration_m, calories
     """
-    fitness_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Fitness'
-
-    activity_files = sorted([
-        f for f in os.listdir(fitness_data_dir)
-        if 'summarizedActivities' in f and f.endswith('.json')
-    ])
+    activity_files = list_activity_files(garmin_path)
 
     if not activity_files:
         return pd.DataFrame()
 
-    my_data = []
-    for each_file in activity_files:
-        with open(os.path.join(fitness_data_dir, each_file)) as json_file:
-            data = json.load(json_file)
-            # Extract activities from the nested structure
-            activities = data[0].get('summarizedActivitiesExport', []) if data else []
-
-            for activity in activities:
-                # Parse start time to get date
-                start_timestamp = activity.get('startTimeGmt', activity.get('beginTimestamp'))
-                if start_timestamp:
-                    date_of_activity = datetime.fromtimestamp(start_timestamp / 1000).date()
+    per_file = _map_files(partial(_parse_activities_file, stream=stream), activity_files, workers)
 
-                    new_row = {
-                        'date': date_of_activity,
-                        'activity_type': activity.get('activityType', 'unknown'),
-                        'sport_type': activity.get('sportType', 'unknown'),
-                        'duration_m': activity.get('duration', 0) / 60000,  # Convert ms to minutes
-                        'calories': activity.get('calories', 0)
-                    }
-                    my_data.append(new_row)
+    df = _buffers_to_frame(per_file, ACTIVITIES_SCHEMA)
+    # Epoch milliseconds -> calendar date in the machine's local timezone
+    df['date'] = (
+        pd.to_datetime(df['date'], unit='ms', utc=True)
+        .dt.tz_convert(tzlocal())
+        .dt.tz_localize(None)
+        .dt.normalize()
+    )
+    return df
 
-    return pd.DataFrame(my_data)
 
-
-def load_garmin_stress(garmin_path: Path) -> pd.DataFrame:
+def load_garmin_stress(garmin_path: Path, uds: pd.DataFrame = None, workers: int = None,
+                       stream: bool = False) -> pd.DataFrame:
     """Load Garmin stress data from UDSFile JSON files.
 
     Args:
         garmin_path: Path to garmin directory containing DI_CONNECT/DI-Connect-Aggregator
+        uds: Result of load_garmin_uds to reuse instead of re-reading the files (optional)
+        workers: Number of processes to parse files with (default: serial)
+        stream: Decode records one at a time to bound memory by record size
 
     Returns:
         DataFrame with columns: date, avg_stress_level, max_stress_level
     """
-    stress_data_dir = garmin_path / 'DI_CONNECT' / 'DI-Connect-Aggregator'
+    if uds is None:
+        uds = load_garmin_uds(garmin_path, workers=workers, stream=stream)
 
-    uds_files = sorted([
-        f for f in os.listdir(stress_data_dir)
-        if os.path.isfile(os.path.join(stress_data_dir, f)) and f.startswith('UDSFile')
-    ])
+    # Only days that carry a TOTAL stress aggregator
+    stress = uds[uds['has_stress'].astype(bool)]
+    return stress[STRESS_COLUMNS].reset_index(drop=True)
 
-    my_data = []
-    for each_file in uds_files:
-        with open(os.path.join(stress_data_dir, each_file)) as json_file:
-            data = json.load(json_file)
-            for each_item in data:
-                date_of_measurement = datetime.strptime(
-                    each_item['calendarDate'],
-                    '%Y-%m-%d'
-                ).date()
-
-                # Extract stress data from allDayStress field
-                stress_data = each_item.get('allDayStress')
-                if stress_data and 'aggregatorList' in stress_data:
-                    # Find the TOTAL aggregator
-                    total_stress = next(
-                        (agg for agg in stress_data['aggregatorList'] if agg.get('type') == 'TOTAL'),
-                        None
-                    )
-                    if total_stress:
-                        new_row = {
-                            'date': date_of_measurement,
-                            'avg_stress_level': total_stress.get('averageStressLevel'),
-                            'max_stress_level': total_stress.get('maxStressLevel')
-                        }
-                        my_data.append(new_row)
-
-    return pd.DataFrame(my_data)
@@ -0,0 +1,253 @@
+from pathlib import Path
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+from matplotlib.colors import to_hex, to_rgba
+
+
+# Pixel size of one day cell, including its 1px white border
+CELL_SIZE = 12
+
+# Colors of days without data and of cells outside a year
+FILL_COLOR = 'whitesmoke'
+BACKGROUND_COLOR = 'white'
+
+
+def _rgba_bytes(color) -> np.ndarray:
+    """Convert a matplotlib color to a uint8 RGBA array."""
+    return np.round(np.asarray(to_rgba(color)) * 255).astype(np.uint8)
+
+
+def colormap_lut(cmap) -> np.ndarray:
+    """Build a uint8 RGBA lookup table of a colormap.
+
+    Args:
+        cmap: Matplotlib colormap
+
+    Returns:
+        Array of shape (N + 2, 4): the under color, the N colormap colors
+        and the over color
+    """
+    colors = np.vstack([[cmap.get_under()], cmap(np.arange(cmap.N)), [cmap.get_over()]])
+    return np.round(colors * 255).astype(np.uint8)
+
+
+def map_colors(values: np.ndarray, cmap, vmin: float, vmax: float) -> np.ndarray:
+    """Map values to RGBA colors with one vectorized table lookup.
+
+    Follows matplotlib's Normalize plus Colormap indexing: values equal to
+    vmax take the last color, values outside [vmin, vmax] take the under
+    and over colors.
+
+    Args:
+        values: Array of finite values
+        cmap: Matplotlib colormap
+        vmin: Value mapped to the first color
+        vmax: Value mapped to the last color
+
+    Returns:
+        uint8 array of shape values.shape + (4,)
+    """
+    if vmax > vmin:
+        scaled = (np.asarray(values, dtype=np.float64) - vmin) / (vmax - vmin) * cmap.N
+    else:
+        scaled = np.zeros(np.shape(values))
+    scaled[scaled == cmap.N] = cmap.N - 1
+    index = np.clip(np.floor(scaled), -1, cmap.N).astype(np.int64) + 1
+    return colormap_lut(cmap)[index]
+
+
+def mostly_zero(by_day: pd.Series) -> bool:
+    """Check calplot's rule for dropping zeros: more than half of the days are zero.
+
+    Args:
+        by_day: Values resampled by day
+
+    Returns:
+        True when zero days are left blank and out of the color scale
+    """
+    return bool((by_day == 0).sum() > 0.5 * by_day.count())
+
+
+def calendar_cells(series: pd.Series, cmap, vmin=None, vmax=None) -> dict:
+    """Place every day of the plotted years on the calendar layout.
+
+    Days are arranged like calplot: one block of 7 rows (Monday on top) and
+    up to 54 week columns per year present in the data, with an empty row
+    between years. Values are summed per day, and zeros are dropped when
+    more than half of the days are zero, as calplot does.
+
+    Args:
+        series: Values indexed by date
+        cmap: Matplotlib colormap
+        vmin: Value mapped to the first color (default: series minimum)
+        vmax: Value mapped to the last color (default: series maximum)
+
+    Returns:
+        Dictionary with 'years' and per-day arrays 'rows', 'columns',
+        'values' (NaN for days without data), 'has_value' and 'colors'
+        (uint8 RGBA, fill color for days without data)
+    """
+    series = pd.Series(series.values, index=pd.DatetimeIndex(series.index))
+    years = np.unique(series.index.year)
+
+    by_day = series.resample('D').agg('sum')
+    if mostly_zero(by_day):
+        by_day = by_day.replace({0: np.nan}).dropna()
+
+    vmin = by_day.min() if vmin is None else vmin
+    vmax = by_day.max() if vmax is None else vmax
+
+    days = pd.date_range(start=str(years[0]), end=str(years[-1] + 1), freq='D')[:-1]
+    days = days[np.isin(days.year, years)]
+
+    # Row and week column of every day of the plotted years
+    year_position = np.searchsorted(years, days.year)
+    first_weekday = pd.DatetimeIndex([f'{year}-01-01' for year in years]).dayofweek.values
+    rows = year_position * 8 + days.dayofweek.values
+    columns = (days.dayofyear.values - 1 + first_weekday[year_position]) // 7
+
+    values = by_day.reindex(days).values.astype(np.float64)
+    has_value = ~np.isnan(values)
+
+    colors = np.empty((len(days), 4), dtype=np.uint8)
+    colors[:] = _rgba_bytes(FILL_COLOR)
+    colors[has_value] = map_colors(values[has_value], cmap, vmin, vmax)
+
+    return {
+        'years': years,
+        'rows': rows,
+        'columns': columns,
+        'values': values,
+        'has_value': has_value,
+        'colors': colors,
+    }
+
+
+def calendar_grid(series: pd.Series, cmap, vmin=None, vmax=None) -> np.ndarray:
+    """Lay out a daily series as a year x weekday x week grid of colors.
+
+    Args:
+        series: Values indexed by date
+        cmap: Matplotlib colormap
+        vmin: Value mapped to the first color (default: series minimum)
+        vmax: Value mapped to the last color (default: series maximum)
+
+    Returns:
+        uint8 RGBA array of shape (8 * years - 1, 54, 4), one pixel per day
+    """
+    cells = calendar_cells(series, cmap, vmin=vmin, vmax=vmax)
+
+    grid = np.empty((len(cells['years']) * 8 - 1, 54, 4), dtype=np.uint8)
+    grid[:] = _rgba_bytes(BACKGROUND_COLOR)
+    grid[cells['rows'], cells['columns']] = cells['colors']
+    return grid
+
+
+def calendar_image(series: pd.Series, cmap, vmin=None, vmax=None, cell_size: int = CELL_SIZE) -> np.ndarray:
+    """Render a calendar heatmap as an RGBA image array.
+
+    Args:
+        series: Values indexed by date
+        cmap: Matplotlib colormap
+        vmin: Value mapped to the first color (optional)
+        vmax: Value mapped to the last color (optional)
+        cell_size: Pixel size of one day cell
+
+    Returns:
+        uint8 RGBA array of shape (rows * cell_size, 54 * cell_size, 4)
+    """
+    grid = calendar_grid(series, cmap, vmin=vmin, vmax=vmax)
+    image = grid.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+
+    # 1px borders between cells
+    border = _rgba_bytes(BACKGROUND_COLOR)
+    image[cell_size - 1::cell_size, :] = border
+    image[:, cell_size - 1::cell_size] = border
+    return image
+
+
+def write_calendar_image(series: pd.Series, cmap, output: Path, vmin=None, vmax=None,
+                         cell_size: int = CELL_SIZE, dpi: int = 100):
+    """Render a calendar heatmap straight to a PNG file without matplotlib axes.
+
+    Args:
+        series: Values indexed by date
+        cmap: Matplotlib colormap
+        output: Output PNG path
+        vmin: Value mapped to the first color (optional)
+        vmax: Value mapped to the last color (optional)
+        cell_size: Pixel size of one day cell
+        dpi: Resolution stored in the PNG metadata
+    """
+    import matplotlib.image as mpimg
+
+    mpimg.imsave(output, calendar_image(series, cmap, vmin=vmin, vmax=vmax, cell_size=cell_size), dpi=dpi)
+
+
+def write_calendar_svg(series: pd.Series, cmap, output: Path, vmin=None, vmax=None,
+                       cell_size: int = CELL_SIZE, textformat: str = None,
+                       textcolor: str = '#999999', title: str = None):
+    """Write a calendar heatmap as SVG with one rect per day.
+
+    The file size depends on the number of days rather than on a pixel
+    resolution, and day labels stay sharp at any zoom level.
+
+    Args:
+        series: Values indexed by date
+        cmap: Matplotlib colormap
+        output: Output SVG path
+        vmin: Value mapped to the first color (optional)
+        vmax: Value mapped to the last color (optional)
+        cell_size: Size of one day cell in SVG user units
+        textformat: Format of the value written in each day, e.g. '{:.0f}' (optional)
+        textcolor: Color of day values
+        title: Title above the calendar (optional)
+    """
+    cells = calendar_cells(series, cmap, vmin=vmin, vmax=vmax)
+
+    label_width = 4 * cell_size
+    top = 2 * cell_size if title else 0
+    width = label_width + 54 * cell_size
+    height = top + (len(cells['years']) * 8 - 1) * cell_size
+
+    elements = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif">',
+        f'<rect width="{width}" height="{height}" fill="{to_hex(BACKGROUND_COLOR)}"/>',
+    ]
+
+    if title:
+        elements.append(
+            f'<text x="{width / 2:g}" y="{cell_size * 1.4:g}" font-size="{cell_size * 1.4:g}" '
+            f'text-anchor="middle">{escape(title)}</text>'
+        )
+
+    for position, year in enumerate(cells['years']):
+        y = top + (position * 8 + 3.5) * cell_size
+        elements.append(
+            f'<text x="{label_width / 2:g}" y="{y:g}" font-size="{cell_size * 1.5:g}" font-weight="bold" '
+            f'fill="gray" text-anchor="middle" dominant-baseline="central" '
+            f'transform="rotate(-90 {label_width / 2:g} {y:g})">{year}</text>'
+        )
+
+    xs = label_width + cells['columns'] * cell_size
+    ys = top + cells['rows'] * cell_size
+    fills = ['#%02x%02x%02x' % tuple(color[:3]) for color in cells['colors']]
+    for x, y, fill in zip(xs, ys, fills):
+        elements.append(f'<rect x="{x}" y="{y}" width="{cell_size - 1}" height="{cell_size - 1}" fill="{fill}"/>')
+
+    if textformat:
+        elements.append(
+            f'<g font-size="{cell_size * 0.5:g}" fill="{textcolor}" text-anchor="middle" dominant-baseline="central">'
+        )
+        has_value = cells['has_value']
+        for x, y, value in zip(xs[has_value], ys[has_value], cells['values'][has_value]):
+            elements.append(f'<text x="{x + cell_size / 2:g}" y="{y + cell_size / 2:g}">{textformat.format(value)}</text>')
+        elements.append('</g>')
+
+    elements.append('</svg>')
+
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(elements))
+        f.write('\n')
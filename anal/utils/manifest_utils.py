@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import pandas as pd
+
+
+def manifest_path_for(output_path: Path) -> Path:
+    """Get manifest path stored next to a prepared output file.
+
+    Args:
+        output_path: Output file, e.g. data/my_garmin_data.tsv
+
+    Returns:
+        Path like data/my_garmin_data.tsv.manifest.json
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.manifest.json')
+
+
+def file_digest(file_path, chunk_size: int = 1 << 20) -> str:
+    """Compute SHA-256 of a file without reading it into memory at once.
+
+    Args:
+        file_path: File to hash
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> dict:
+    """Load a manifest of processed input files.
+
+    Args:
+        manifest_path: Manifest JSON file
+
+    Returns:
+        Dict with 'options' (settings the output was built with) and
+        'files' (path -> {size, mtime, sha256}); empty if missing
+    """
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {'options': None, 'files': {}}
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_path: Path, files: dict, options: dict = None):
+    """Write a manifest of processed input files.
+
+    Args:
+        manifest_path: Manifest JSON file
+        files: Mapping path -> {size, mtime, sha256}
+        options: Settings the output was built with (e.g. timezone offset)
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'options': options, 'files': files}, f, indent=2, sort_keys=True)
+
+
+def scan_files(file_paths: list, manifest: dict) -> tuple:
+    """Compare input files against a manifest.
+
+    Size and mtime are checked first; the content hash is only computed when
+    either differs, so unchanged exports are detected without reading them.
+
+    Args:
+        file_paths: Input files to check
+        manifest: Result of load_manifest
+
+    Returns:
+        Tuple of (changed_files, entries) where changed_files are new or
+        modified paths and entries is the manifest 'files' mapping for all inputs
+    """
+    known = manifest.get('files', {})
+    changed_files = []
+    entries = {}
+
+    for each_file in file_paths:
+        key = os.path.abspath(each_file)
+        stat = os.stat(each_file)
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        previous = known.get(key)
+
+        if previous and previous['size'] == entry['size'] and previous['mtime'] == entry['mtime']:
+            entry['sha256'] = previous['sha256']
+        else:
+            entry['sha256'] = file_digest(each_file)
+            if not previous or previous['sha256'] != entry['sha256']:
+                changed_files.append(each_file)
+
+        entries[key] = entry
+
+    return changed_files, entries
+
+
+def merge_by_date(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Merge freshly parsed rows into an existing dataset by date.
+
+    Values from new rows win; columns missing (NaN) in new rows keep the
+    existing value, so a partial update (e.g. only steps) does not erase
+    other columns for the same day.
+
+    Args:
+        existing: Previously prepared DataFrame with a 'date' column
+        new: Newly parsed DataFrame with a 'date' column
+
+    Returns:
+        DataFrame sorted by date with the column order of existing
+    """
+    if existing.empty:
+        return new
+    if new.empty:
+        return existing
+
+    existing = existing.assign(date=pd.to_datetime(existing['date'])).drop_duplicates('date', keep='last')
+    new = new.assign(date=pd.to_datetime(new['date'])).drop_duplicates('date', keep='last')
+
+    merged = new.set_index('date').combine_first(existing.set_index('date'))
+    columns = list(existing.columns) + [c for c in new.columns if c not in existing.columns]
+
+    return merged.reset_index()[columns]
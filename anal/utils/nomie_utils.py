@@ -1,7 +1,7 @@
 from pathlib import Path
 import pandas as pd
 import json
-import re
+import sqlite3
 
 
 # Tracker name to emoji mapping
@@ -15,12 +15,64 @@ TRACKER_EMOJI_MAP = {
     'cigar': '🚬',
 }
 
+# Tag in notes like #beer(1) or #shot(1.5)
+NOTE_TAG_PATTERN = r'#(\w+)\((\d+(?:\.\d+)?)\)'
 
-def load_nomie_data(nomie_file: Path) -> pd.DataFrame:
-    """Load Nomie export (JSON or CSV) and prepare for analysis.
+# Event columns needed for analysis (notes carry the #tracker(value) tags)
+NOMIE_EVENT_COLUMNS = ['id', 'start', 'notes']
+
+
+def _event_chunks(conn, query: str, params: tuple, chunk_size: int, tagged_only: bool):
+    """Yield chunks of queried events, dropping untagged ones before the next fetch."""
+    for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunk_size):
+        if tagged_only:
+            chunk = chunk[chunk['notes'].str.count(NOTE_TAG_PATTERN) > 0]
+        yield chunk
+
+
+def read_nomie_events(db_path: Path, columns: list = NOMIE_EVENT_COLUMNS, watermark: int = None,
+                      chunk_size: int = 10000, tagged_only: bool = False) -> pd.DataFrame:
+    """Read events straight from the Nomie SQLite database.
+
+    Args:
+        db_path: Path to n3-events.v1.0.0.db
+        columns: Columns to select (None selects all)
+        watermark: Only return events with start >= watermark (epoch milliseconds)
+        chunk_size: Rows fetched per round trip
+        tagged_only: Drop events whose notes have no #tracker(value) tag, chunk
+            by chunk, so only the kept events are held in memory
+
+    Returns:
+        DataFrame of events ordered by start descending
+    """
+    selected = ', '.join(columns) if columns else '*'
+    query = f"SELECT {selected} FROM events"
+    params = ()
+    if watermark is not None:
+        query += " WHERE start >= ?"
+        params = (int(watermark),)
+    query += " ORDER BY start DESC"
+
+    conn = sqlite3.connect(db_path)
+    try:
+        chunks = [
+            chunk for chunk in _event_chunks(conn, query, params, chunk_size, tagged_only)
+            if not chunk.empty
+        ]
+    finally:
+        conn.close()
+
+    if not chunks:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_nomie_data(nomie_file: Path, watermark: int = None) -> pd.DataFrame:
+    """Load Nomie export (JSON, CSV or SQLite database) and prepare for analysis.
 
     Args:
-        nomie_file: Path to Nomie JSON or CSV export
+        nomie_file: Path to Nomie JSON or CSV export, or the n3-events .db file
+        watermark: For JSON and .db files, only load events with start >= watermark (epoch ms)
 
     Returns:
         DataFrame with columns: date, year, emoji, value, tracker, etc.
@@ -28,16 +80,21 @@ def load_nomie_data(nomie_file: Path) -> pd.DataFrame:
     nomie_file = Path(nomie_file)
 
     # Load based on file extension
-    if nomie_file.suffix == '.json':
-        with open(nomie_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
-
-        # Parse notes field to extract tracker and value
+    if nomie_file.suffix in ('.json', '.db'):
+        if nomie_file.suffix == '.db':
+            # Events without tags have no tracker, so they are not kept
+            df = read_nomie_events(nomie_file, watermark=watermark, tagged_only=True)
+        else:
+            with open(nomie_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            df = pd.DataFrame(data)
+            if watermark is not None and 'start' in df.columns:
+                df = df[df['start'] >= int(watermark)]
+
+        # Parse notes field to extract tracker and value (one row per tag)
         if 'notes' in df.columns:
-            parsed = df['notes'].apply(_parse_notes)
-            df['tracker'] = parsed.apply(lambda x: x[0])
-            df['value'] = parsed.apply(lambda x: x[1])
+            df = df.reset_index(drop=True).join(_parse_notes(df['notes']), how='left')
+            df = df.reset_index(drop=True)
             df['emoji'] = df['tracker'].map(TRACKER_EMOJI_MAP)
 
     else:
@@ -59,24 +116,22 @@ def load_nomie_data(nomie_file: Path) -> pd.DataFrame:
     return df
 
 
-def _parse_notes(notes: str) -> tuple:
-    """Parse Nomie notes field to extract tracker and value.
+def _parse_notes(notes: pd.Series) -> pd.DataFrame:
+    """Parse Nomie notes to extract every tracker and value.
 
     Args:
-        notes: Notes string like ' \n#beer(1)' or '#wine(2)'
+        notes: Series of notes strings like ' \n#beer(1)' or '#wine(2) #cigar(1)'
 
     Returns:
-        Tuple of (tracker_name, value)
+        DataFrame with columns tracker, value and one row per tag, indexed by
+        the position of the note in notes; notes without tags have no rows
     """
-    if not notes or not isinstance(notes, str):
-        return (None, None)
-
     # Match pattern like #tracker(value)
-    match = re.search(r'#(\w+)\((\d+(?:\.\d+)?)\)', notes)
-    if match:
-        return (match.group(1), float(match.group(2)))
-
-    return (None, None)
+    tags = notes.reset_index(drop=True).str.extractall(NOTE_TAG_PATTERN)
+    tags = tags.reset_index(level='match', drop=True)
+    tags.columns = ['tracker', 'value']
+    tags['value'] = tags['value'].astype(float)
+    return tags
 
 
 def filter_alcohol_substances(df: pd.DataFrame) -> pd.DataFrame:
@@ -0,0 +1,284 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+from utils.manifest_utils import scan_files
+
+
+# Bump when the layout of the pipeline state file changes
+PIPELINE_STATE_VERSION = 1
+
+
+def stage(name: str, script: Path, args: list = (), inputs: list = (), outputs: list = (),
+          after: list = ()) -> dict:
+    """Describe a pipeline stage that runs one Python script.
+
+    Args:
+        name: Unique stage name
+        script: Python script to run; it runs from its own directory
+        args: Command line arguments of the script
+        inputs: Files or directories the stage reads; directories count as
+            all files below them. The script itself is always an input
+        outputs: Files the stage writes
+        after: Names of stages that must finish first, usually the ones
+            writing this stage's inputs
+
+    Returns:
+        Stage dictionary
+    """
+    return {
+        'name': name,
+        'script': Path(script),
+        'args': [str(arg) for arg in args],
+        'inputs': [Path(script)] + [Path(path) for path in inputs],
+        'outputs': [Path(path) for path in outputs],
+        'after': list(after),
+    }
+
+
+def _check_stages(stages: list):
+    """Reject unknown dependencies, duplicate names and cycles."""
+    names = [each_stage['name'] for each_stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate stage names")
+
+    by_name = {each_stage['name']: each_stage for each_stage in stages}
+    for each_stage in stages:
+        for dependency in each_stage['after']:
+            if dependency not in by_name:
+                raise ValueError(f"Stage {each_stage['name']} depends on unknown stage {dependency}")
+
+    # Depth-first search for back edges
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name}")
+        visiting.add(name)
+        for dependency in by_name[name]['after']:
+            visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in names:
+        visit(name)
+
+
+def list_input_files(inputs: list) -> list:
+    """Expand stage inputs to a sorted list of files.
+
+    Args:
+        inputs: Files or directories
+
+    Returns:
+        Sorted list of file paths, or None if an input does not exist
+    """
+    files = []
+    for each_input in inputs:
+        if each_input.is_dir():
+            files.extend(
+                os.path.join(directory, f)
+                for directory, _, names in os.walk(each_input) for f in names
+            )
+        elif each_input.is_file():
+            files.append(str(each_input))
+        else:
+            return None
+    return sorted(files)
+
+
+def load_pipeline_state(state_path: Path) -> dict:
+    """Load input signatures recorded by previous pipeline runs.
+
+    Args:
+        state_path: Pipeline state JSON file
+
+    Returns:
+        Dictionary stage name -> {'command', 'files'}; empty if missing or outdated
+    """
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return {}
+
+    with open(state_path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != PIPELINE_STATE_VERSION:
+        return {}
+    return state['stages']
+
+
+def save_pipeline_state(state_path: Path, stages: dict):
+    """Write input signatures of the stages that ran successfully.
+
+    Args:
+        state_path: Pipeline state JSON file
+        stages: Dictionary stage name -> {'command', 'files'}
+    """
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(state_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': PIPELINE_STATE_VERSION, 'stages': stages}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def stage_command(each_stage: dict) -> list:
+    """Command line of a stage."""
+    return [sys.executable, each_stage['script'].name] + each_stage['args']
+
+
+def check_stage(each_stage: dict, previous: dict) -> tuple:
+    """Decide whether a stage has to run.
+
+    Inputs are compared by size and mtime first and by content hash only
+    when those differ, so touching a file without changing it does not
+    trigger a run.
+
+    Args:
+        each_stage: Stage dictionary
+        previous: Recorded {'command', 'files'} of the stage, or None
+
+    Returns:
+        Tuple of (reason, entries) where reason is None when the stage is
+        up to date, and entries are the current input signatures
+    """
+    files = list_input_files(each_stage['inputs'])
+    if files is None:
+        return 'missing input', None
+
+    previous = previous or {'command': None, 'files': {}}
+    changed_files, entries = scan_files(files, previous)
+
+    if previous['command'] is None:
+        return 'never run', entries
+    if previous['command'] != stage_command(each_stage)[1:]:
+        return 'command changed', entries
+    missing_outputs = [path for path in each_stage['outputs'] if not path.exists()]
+    if missing_outputs:
+        return f'missing output {missing_outputs[0].name}', entries
+    if changed_files:
+        return f'{len(changed_files)} input files changed', entries
+    if set(entries) != set(previous['files']):
+        return 'input files removed', entries
+    return None, entries
+
+
+def _run_stage(each_stage: dict) -> subprocess.CompletedProcess:
+    """Run a stage script from its directory and capture its output."""
+    return subprocess.run(
+        stage_command(each_stage),
+        cwd=each_stage['script'].parent,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+
+
+def run_pipeline(stages: list, state_path: Path, workers: int = 1, force: bool = False,
+                 dry_run: bool = False, verbose: bool = False) -> dict:
+    """Run stages in dependency order, skipping those whose inputs are unchanged.
+
+    A stage starts as soon as all stages it depends on have finished, so
+    independent branches run in parallel. Freshness is checked right before
+    a stage would start, after its upstream stages rewrote their outputs;
+    an upstream run that leaves an output byte-identical does not trigger
+    downstream work.
+
+    Args:
+        stages: List of stage dictionaries
+        state_path: Pipeline state JSON file
+        workers: Maximum number of stages running at once
+        force: Run every stage regardless of its recorded state
+        dry_run: Only report which stages would run; upstream stages are
+            assumed to change their outputs
+        verbose: Print the output of stages that succeeded too
+
+    Returns:
+        Dictionary stage name -> 'ran', 'up to date', 'would run',
+        'skipped', 'failed' or 'blocked'
+    """
+    _check_stages(stages)
+    by_name = {each_stage['name']: each_stage for each_stage in stages}
+    state = load_pipeline_state(state_path)
+    results = {}
+    running = {}
+
+    def ready():
+        return [
+            each_stage for each_stage in stages
+            if each_stage['name'] not in results and each_stage['name'] not in running.values()
+            and all(dependency in results for dependency in each_stage['after'])
+        ]
+
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while len(results) < len(stages):
+            for each_stage in ready():
+                if len(running) >= workers:
+                    break
+                name = each_stage['name']
+                upstream = [results[dependency] for dependency in each_stage['after']]
+                if any(result in ('failed', 'blocked') for result in upstream):
+                    print(f"[{name}] blocked by a failed upstream stage")
+                    results[name] = 'blocked'
+                    continue
+
+                if dry_run and 'would run' in upstream:
+                    print(f"[{name}] would run: upstream would run")
+                    results[name] = 'would run'
+                    continue
+
+                # Skipped upstream stages only matter if their outputs are missing
+                reason, entries = check_stage(each_stage, state.get(name))
+                if reason == 'missing input':
+                    print(f"[{name}] skipped: missing input")
+                    results[name] = 'skipped'
+                    continue
+                if force:
+                    reason = reason or 'forced'
+                if reason is None:
+                    print(f"[{name}] up to date")
+                    results[name] = 'up to date'
+                    # Remember new mtimes of rewritten but identical inputs
+                    if not dry_run and entries != state[name]['files']:
+                        state[name]['files'] = entries
+                        save_pipeline_state(state_path, state)
+                    continue
+                if dry_run:
+                    print(f"[{name}] would run: {reason}")
+                    results[name] = 'would run'
+                    continue
+
+                print(f"[{name}] running: {reason}")
+                each_stage = dict(each_stage, entries=entries)
+                running[executor.submit(_run_stage, each_stage)] = name
+                by_name[name] = each_stage
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                each_stage = by_name[name]
+                completed = future.result()
+                if completed.returncode == 0:
+                    if verbose:
+                        print(completed.stdout, end='')
+                    print(f"[{name}] done")
+                    results[name] = 'ran'
+                    state[name] = {'command': stage_command(each_stage)[1:], 'files': each_stage['entries']}
+                    save_pipeline_state(state_path, state)
+                else:
+                    print(completed.stdout, end='')
+                    print(f"[{name}] failed with exit code {completed.returncode}")
+                    results[name] = 'failed'
+                    state.pop(name, None)
+                    save_pipeline_state(state_path, state)
+
+    return results
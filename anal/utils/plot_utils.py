@@ -0,0 +1,540 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from utils.cache_utils import write_frame, read_frame
+from utils.colormap_utils import (
+    create_steps_colormap,
+    create_alcohol_colormap,
+    create_business_hours_colormap,
+    create_sleep_colormap,
+    create_activities_colormap,
+    create_stress_colormap,
+    create_resting_hr_colormap,
+    create_general_hr_colormap,
+    create_bedtime_colormap,
+    create_waketime_colormap,
+    create_floors_colormap,
+)
+from utils.feature_utils import derive_features
+from utils.nomie_utils import get_daily_counts
+from utils.render_utils import calendar_job, bars_job
+from utils.rollup_utils import (
+    rollup_path_for, build_rollup, changed_months, update_rollup, read_rollup, year_table
+)
+from utils.store_utils import read_daily
+
+
+# Prepared datasets: name -> (file in data dir, date columns)
+DATASETS = {
+    'garmin': ('my_garmin_data.tsv', ['date', 'sleep_start', 'sleep_end']),
+    'sleep': ('my_garmin_sleep.tsv', ['date', 'sleep_start', 'sleep_end']),
+    'activities': ('my_garmin_activities.tsv', ['date']),
+    'stress': ('my_garmin_stress.tsv', ['date']),
+}
+
+# Columns of each dataset in the daily store (see store_utils.DAILY_COLUMNS)
+STORE_DATASETS = {
+    'garmin': ['steps_cnt', 'min_hr', 'min_avg_hr', 'max_avg_hr', 'max_hr', 'resting_hr',
+               'floors_ascended_m', 'sleep_start', 'sleep_end', 'floors_climbed'],
+    'sleep': ['sleep_start', 'sleep_end', 'sleep_duration_h'],
+    'activities': ['activity_count'],
+    'stress': ['avg_stress_level', 'max_stress_level'],
+    'toggl': ['business_hours'],
+}
+
+# Heart rate metrics: (column, title, colormap factory, vmax)
+HEART_RATE_METRICS = [
+    ('min_hr', 'Minimum Heart Rate', create_general_hr_colormap, 220),
+    ('min_avg_hr', 'Minimum Average Heart Rate', create_general_hr_colormap, 220),
+    ('max_avg_hr', 'Maximum Average Heart Rate', create_general_hr_colormap, 220),
+    ('max_hr', 'Maximum Heart Rate', create_general_hr_colormap, 220),
+    ('resting_hr', 'Resting Heart Rate', create_resting_hr_colormap, 150),
+]
+
+# Binned metrics: each bin is an (operator, edge) test tried in order, and
+# values passing none of them fall into the last bin. Missing values fall into
+# the last bin too with 'missing_last', and get no bin otherwise.
+METRICS = {
+    'steps': {
+        'column': 'steps_cnt',
+        'category_column': 'steps_cnt_grouped',
+        'bins': [('<=', 5000), ('<=', 10000)],
+        'missing_last': True,
+        'labels': ['<=5k steps', '5k-10k steps', '>10k steps'],
+        'colors': ['#f3a0bc', '#f8e447', '#99ff66'],
+        'title': 'Steps over years',
+        'ylabel': 'Days with steps',
+    },
+    'sleep': {
+        'column': 'sleep_duration_h',
+        'category_column': 'sleep_category',
+        'bins': [('<', 7), ('<=', 8)],
+        'missing_last': True,
+        'labels': ['<7h sleep', '7-8h sleep', '>8h sleep'],
+        'colors': ['#f3a0bc', '#99ff66', '#66cc33'],
+        'title': 'Sleep duration over years',
+        'ylabel': 'Days',
+    },
+    'activities': {
+        'column': 'activity_count',
+        'category_column': 'activity_category',
+        'bins': [('==', 0), ('<=', 2)],
+        'missing_last': True,
+        'labels': ['0 activities', '1-2 activities', '3+ activities'],
+        'colors': ['#ff0000', '#99ff66', '#66cc33'],
+        'title': 'Exercise activities over years',
+        'ylabel': 'Days',
+    },
+    'stress': {
+        'column': 'avg_stress_level',
+        'category_column': 'stress_category',
+        'bins': [('<=', 25), ('<=', 40), ('<=', 60)],
+        'missing_last': False,
+        'labels': ['Very low (0-25)', 'Low (26-40)', 'Moderate (41-60)', 'High (61+)'],
+        'colors': ['#66cc33', '#99ff66', '#f3a0bc', '#ff0000'],
+        'title': 'Stress levels over years',
+        'ylabel': 'Days',
+    },
+}
+
+
+# Metrics of each prepared dataset with year and month rollups next to it
+ROLLUP_METRICS = {
+    'garmin': ['steps'],
+    'sleep': ['sleep'],
+    'activities': ['activities'],
+    'stress': ['stress'],
+}
+
+
+def _metric_feature(name: str) -> tuple:
+    """Derived feature assigning the bins of a registered metric."""
+    metric = METRICS[name]
+    return (
+        metric['category_column'], 'bins', metric['column'],
+        {'bins': metric['bins'], 'missing_last': metric['missing_last']}
+    )
+
+
+# Derived columns of each plot, see feature_utils.derive_features:
+# (column, kind, source column, keyword arguments)
+FEATURES = {
+    'steps': [
+        ('steps_k_cnt', 'round', 'steps_cnt', {'divisor': 1000, 'integer': True}),
+        _metric_feature('steps'),
+        ('year', 'year', 'date', {}),
+    ],
+    'sleep': [
+        ('sleep_hours_rounded', 'round', 'sleep_duration_h', {}),
+        _metric_feature('sleep'),
+        ('year', 'year', 'date', {}),
+    ],
+    'activities': [
+        _metric_feature('activities'),
+        ('year', 'year', 'date', {}),
+    ],
+    'stress': [
+        _metric_feature('stress'),
+        ('year', 'year', 'date', {}),
+    ],
+    'sleep_times': [
+        ('bedtime_hour', 'hour', 'sleep_start', {}),
+        ('waketime_hour', 'hour', 'sleep_end', {}),
+    ],
+}
+
+
+def load_dataset(input_path: Path, name: str) -> pd.DataFrame:
+    """Load a prepared dataset with its date columns parsed.
+
+    Args:
+        input_path: Prepared TSV path
+        name: Dataset name from DATASETS
+
+    Returns:
+        DataFrame
+    """
+    _, parse_dates = DATASETS[name]
+    return read_frame(input_path, parse_dates=parse_dates)
+
+
+def load_datasets(data_dir: Path, names=None) -> dict:
+    """Load prepared datasets once so several plots can share them.
+
+    Args:
+        data_dir: Directory with prepared TSV files
+        names: Dataset names to load (default: all in DATASETS)
+
+    Returns:
+        Dictionary name -> DataFrame; datasets whose file is missing are left out
+    """
+    datasets = {}
+    for name in names or DATASETS:
+        input_path = Path(data_dir) / DATASETS[name][0]
+        if not input_path.exists():
+            print(f"Warning: {input_path} not found, skipping {name} plots...")
+            continue
+        print(f"Loading data from {input_path}")
+        datasets[name] = load_dataset(input_path, name)
+    return datasets
+
+
+def load_store_datasets(store_path: Path, names=None, start=None, end=None) -> dict:
+    """Load datasets for a date range from the SQLite daily store.
+
+    Args:
+        store_path: Daily store written by the prepare scripts with --store
+        names: Dataset names to load (default: all in STORE_DATASETS)
+        start: First date, inclusive (optional)
+        end: Last date, inclusive (optional)
+
+    Returns:
+        Dictionary name -> DataFrame shaped like the prepared TSVs ('toggl'
+        like toggl_utils.load_toggl_hours); datasets without days are left out
+    """
+    datasets = {}
+    for name in names or STORE_DATASETS:
+        df = read_daily(store_path, STORE_DATASETS[name], start=start, end=end)
+        if df.empty:
+            print(f"Warning: no {name} days in {store_path}, skipping {name} plots...")
+            continue
+        if name == 'toggl':
+            df = df.rename(columns={'business_hours': 'duration_h'})
+        datasets[name] = df
+    return datasets
+
+
+def rollup_options(*names) -> dict:
+    """Bins the rollups of datasets are built with, for prepare manifests.
+
+    Args:
+        *names: Dataset names from ROLLUP_METRICS
+
+    Returns:
+        Dictionary metric -> 'bins' as a list of [operator, edge] and
+        'missing_last', as stored in JSON
+    """
+    return {
+        metric: {
+            'bins': [list(each_bin) for each_bin in METRICS[metric]['bins']],
+            'missing_last': METRICS[metric]['missing_last'],
+        }
+        for name in names for metric in ROLLUP_METRICS[name]
+    }
+
+
+def write_rollups(df: pd.DataFrame, name: str, output_path: Path, previous: pd.DataFrame = None,
+                  new: pd.DataFrame = None) -> pd.DataFrame:
+    """Write the year and month rollups of a prepared dataset next to it.
+
+    After an incremental update only the months touched by it, and the
+    years containing them, are recounted; the rest of the previous rollup
+    is kept.
+
+    Args:
+        df: Prepared DataFrame as written to output_path
+        name: Dataset name from ROLLUP_METRICS
+        output_path: Prepared TSV path
+        previous: Dataset before an incremental update (optional)
+        new: Rows merged into it by the update (optional)
+
+    Returns:
+        Rollup DataFrame
+    """
+    metrics = {metric: METRICS[metric] for metric in ROLLUP_METRICS[name]}
+    rollup_path = rollup_path_for(output_path)
+
+    if previous is not None and new is not None and rollup_path.exists():
+        months = changed_months(df, previous, new)
+        print(f"Updating rollups of {len(months)} months in {rollup_path}")
+        rollup = update_rollup(read_frame(rollup_path), df, metrics, months)
+    else:
+        print(f"Saving rollups to {rollup_path}")
+        rollup = build_rollup(df, metrics)
+
+    write_frame(rollup, rollup_path)
+    return rollup
+
+
+def load_rollups(data_dir: Path, names=None) -> dict:
+    """Load current rollups of prepared datasets.
+
+    Args:
+        data_dir: Directory with prepared TSV files
+        names: Dataset names (default: all in ROLLUP_METRICS)
+
+    Returns:
+        Dictionary name -> rollup DataFrame; missing or outdated rollups are left out
+    """
+    rollups = {}
+    for name in names or ROLLUP_METRICS:
+        rollup = read_rollup(Path(data_dir) / DATASETS[name][0])
+        if rollup is not None:
+            rollups[name] = rollup
+    return rollups
+
+
+def year_bin_counts(df: pd.DataFrame, metric: dict) -> pd.DataFrame:
+    """Count days per year and bin in one grouped histogram.
+
+    Args:
+        df: DataFrame with 'year' and the metric's category column
+        metric: Entry of METRICS
+
+    Returns:
+        DataFrame with 'year' and one 'bin_<n>' column per bin, with zeros
+        for bins without days
+    """
+    categories = df[metric['category_column']]
+    binned = categories.notna().to_numpy()
+    years, year_index = np.unique(df['year'].to_numpy()[binned], return_inverse=True)
+
+    counts = np.zeros((len(years), len(metric['labels'])), dtype=np.int64)
+    np.add.at(counts, (year_index, categories.to_numpy()[binned].astype(np.int64) - 1), 1)
+
+    table = pd.DataFrame(counts, columns=[f'bin_{n}' for n in range(1, len(metric['labels']) + 1)])
+    table.insert(0, 'year', years)
+    return table
+
+
+def metric_bars_job(df: pd.DataFrame, name: str, output=None, rollup: pd.DataFrame = None) -> dict:
+    """Describe the year x bin bar chart of a registered metric.
+
+    Args:
+        df: DataFrame with 'year' and the metric's category column
+        name: Metric name from METRICS
+        output: Output PNG for bar chart (optional)
+        rollup: Rollup of the dataset; its yearly counts are used instead
+            of counting the days of df (optional)
+
+    Returns:
+        Figure job
+    """
+    metric = METRICS[name]
+    if rollup is not None:
+        table = year_table(rollup, name, len(metric['labels']))
+    else:
+        table = year_bin_counts(df, metric)
+    return bars_job(
+        table,
+        [
+            (f'bin_{n}', color, label)
+            for n, (color, label) in enumerate(zip(metric['colors'], metric['labels']), start=1)
+        ],
+        title=metric['title'],
+        ylabel=metric['ylabel'],
+        output=output
+    )
+
+
+def heart_rate_figures(df: pd.DataFrame, output_prefix: str = None) -> list:
+    """Describe calendar plots of all heart rate metrics.
+
+    Args:
+        df: Garmin daily DataFrame
+        output_prefix: Output file prefix, e.g. "hr" creates hr_min_hr.png (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    jobs = []
+    for metric_col, metric_title, create_colormap, vmax in HEART_RATE_METRICS:
+        if metric_col not in df.columns:
+            print(f"Warning: {metric_col} not found in data, skipping...")
+            continue
+
+        # Skip if no data
+        if df[metric_col].isna().all():
+            print(f"Warning: No data for {metric_col}, skipping...")
+            continue
+
+        hr_series = pd.Series(df[metric_col].values, index=pd.to_datetime(df['date']))
+        jobs.append(calendar_job(
+            hr_series,
+            create_colormap(),
+            output=f"{output_prefix}_{metric_col}.png" if output_prefix else None,
+            name=metric_title,
+            vmin=0,
+            vmax=vmax,
+            title=metric_title
+        ))
+    return jobs
+
+
+def prepare_steps(df: pd.DataFrame) -> pd.DataFrame:
+    """Add rounded thousands of steps, step category and year columns."""
+    return derive_features(df, FEATURES['steps'])
+
+
+def steps_figures(df: pd.DataFrame, output_calendar=None, output_bars=None, rollup: pd.DataFrame = None) -> list:
+    """Describe steps calendar and bar chart.
+
+    Args:
+        df: Result of prepare_steps
+        output_calendar: Output PNG for calendar plot (optional)
+        output_bars: Output PNG for bar chart (optional)
+        rollup: Rollup of the dataset for the bar chart (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    steps_series = pd.Series(df['steps_k_cnt'].values, index=df['date'])
+
+    return [
+        calendar_job(steps_series, create_steps_colormap(), output=output_calendar),
+        metric_bars_job(df, 'steps', output=output_bars, rollup=rollup),
+    ]
+
+
+def prepare_sleep(df: pd.DataFrame) -> pd.DataFrame:
+    """Add rounded sleep hours, sleep category and year columns."""
+    return derive_features(df, FEATURES['sleep'])
+
+
+def sleep_figures(df: pd.DataFrame, output_calendar=None, output_bars=None, rollup: pd.DataFrame = None) -> list:
+    """Describe sleep duration calendar and bar chart.
+
+    Args:
+        df: Result of prepare_sleep
+        output_calendar: Output PNG for calendar plot (optional)
+        output_bars: Output PNG for bar chart (optional)
+        rollup: Rollup of the dataset for the bar chart (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    sleep_series = pd.Series(df['sleep_hours_rounded'].values, index=df['date'])
+
+    return [
+        calendar_job(sleep_series, create_sleep_colormap(), output=output_calendar),
+        metric_bars_job(df, 'sleep', output=output_bars, rollup=rollup),
+    ]
+
+
+def prepare_activities(df: pd.DataFrame) -> pd.DataFrame:
+    """Add activity category and year columns."""
+    return derive_features(df, FEATURES['activities'])
+
+
+def activities_figures(df: pd.DataFrame, output_calendar=None, output_bars=None, rollup: pd.DataFrame = None) -> list:
+    """Describe activities calendar and bar chart.
+
+    Args:
+        df: Result of prepare_activities
+        output_calendar: Output PNG for calendar plot (optional)
+        output_bars: Output PNG for bar chart (optional)
+        rollup: Rollup of the dataset for the bar chart (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    activities_series = pd.Series(df['activity_count'].values, index=pd.to_datetime(df['date']))
+
+    return [
+        calendar_job(activities_series, create_activities_colormap(), output=output_calendar, vmin=0),
+        metric_bars_job(df, 'activities', output=output_bars, rollup=rollup),
+    ]
+
+
+def prepare_stress(df: pd.DataFrame) -> pd.DataFrame:
+    """Add stress category and year columns."""
+    return derive_features(df, FEATURES['stress'])
+
+
+def stress_figures(df: pd.DataFrame, output_calendar=None, output_bars=None, rollup: pd.DataFrame = None) -> list:
+    """Describe stress calendar and, if any day has stress data, bar chart.
+
+    Args:
+        df: Result of prepare_stress
+        output_calendar: Output PNG for calendar plot (optional)
+        output_bars: Output PNG for bar chart (optional)
+        rollup: Rollup of the dataset for the bar chart (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    stress_series = pd.Series(df['avg_stress_level'].values, index=pd.to_datetime(df['date']))
+    jobs = [calendar_job(stress_series, create_stress_colormap(), output=output_calendar, vmin=0)]
+
+    # Bar chart only when some day has stress data
+    if df['stress_category'].notna().any():
+        jobs.append(metric_bars_job(df, 'stress', output=output_bars, rollup=rollup))
+    return jobs
+
+
+def prepare_sleep_times(df: pd.DataFrame) -> pd.DataFrame:
+    """Add bedtime and wake time hour columns."""
+    return derive_features(df, FEATURES['sleep_times'])
+
+
+def sleep_time_figures(df: pd.DataFrame, output_bedtime=None, output_waketime=None) -> list:
+    """Describe bedtime and wake time calendars.
+
+    Args:
+        df: Result of prepare_sleep_times
+        output_bedtime: Output PNG for bedtime calendar plot (optional)
+        output_waketime: Output PNG for wake time calendar plot (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    bedtime_series = pd.Series(df['bedtime_hour'].values, index=pd.to_datetime(df['date']))
+    waketime_series = pd.Series(df['waketime_hour'].values, index=pd.to_datetime(df['date']))
+
+    return [
+        calendar_job(bedtime_series, create_bedtime_colormap(), output=output_bedtime,
+                     name='bedtime calendar', vmin=0, vmax=24),
+        calendar_job(waketime_series, create_waketime_colormap(), output=output_waketime,
+                     name='wake time calendar', vmin=0, vmax=24),
+    ]
+
+
+def floors_figures(df: pd.DataFrame, output=None) -> list:
+    """Describe floors climbed calendar.
+
+    Args:
+        df: Garmin daily DataFrame
+        output: Output PNG file path (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    floors_series = pd.Series(df['floors_climbed'].values, index=pd.to_datetime(df['date']))
+    return [
+        calendar_job(floors_series, create_floors_colormap(), output=output,
+                     name='floors calendar', vmin=0, vmax=100),
+    ]
+
+
+def alcohol_figures(nomie_df: pd.DataFrame, output=None) -> list:
+    """Describe alcohol/substance calendar.
+
+    Args:
+        nomie_df: Nomie DataFrame filtered to the tracked substances
+        output: Output PNG for calendar plot (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    daily_counts = get_daily_counts(nomie_df)
+    max_per_day = int(daily_counts.max())
+    alcohol_cmap = create_alcohol_colormap(max_per_day, limit_good=1, limit_ok=3)
+    return [calendar_job(daily_counts, alcohol_cmap, output=output)]
+
+
+def business_hours_figures(hours_df: pd.DataFrame, output=None) -> list:
+    """Describe business hours calendar.
+
+    Args:
+        hours_df: Result of toggl_utils.load_toggl_hours
+        output: Output PNG file (optional)
+
+    Returns:
+        List of figure jobs
+    """
+    duration_series = pd.Series(
+        hours_df['duration_h'].values,
+        index=hours_df['date']
+    )
+    return [calendar_job(duration_series, create_business_hours_colormap(), output=output, dpi=1000)]
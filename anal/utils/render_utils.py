@@ -0,0 +1,512 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import hashlib
+from importlib.metadata import version
+import json
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from utils.heatmap_utils import mostly_zero, write_calendar_image, write_calendar_svg
+
+
+# Calendar styling shared by all plot scripts
+CALENDAR_STYLE = {
+    'textformat': '{:.0f}',
+    'textcolor': '#999999',
+    'linewidth': 0.0005,
+    'edgecolor': 'white',
+}
+
+# Bump when drawing code changes so cached renders are not reused
+# (2: calendar .svg outputs written by heatmap_utils.write_calendar_svg)
+RENDER_CACHE_VERSION = 2
+
+# Size the render cache is pruned to after each batch, least recently used first
+RENDER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def calendar_job(series: pd.Series, cmap, output=None, name: str = 'calendar plot',
+                 vmin=None, vmax=None, dpi: int = 100, title: str = None, figsize=None,
+                 colorbar=None, dropzero=None) -> dict:
+    """Describe a calendar heatmap figure.
+
+    Args:
+        series: Daily values indexed by date
+        cmap: Colormap, e.g. from colormap_utils
+        output: Output PNG path (None to only show the figure)
+        name: Figure name used in progress messages
+        vmin: Lower bound of the color scale (optional)
+        vmax: Upper bound of the color scale (optional)
+        dpi: Output resolution
+        title: Figure title (optional)
+        figsize: Figure size in inches (default: sized by calplot from the years shown)
+        colorbar: Draw a colorbar (default: when the series has more than one value)
+        dropzero: Leave zero days blank and out of the color scale (default:
+            when more than half of the days are zero)
+
+    Returns:
+        Figure job dictionary for render_figure
+    """
+    return {
+        'kind': 'calendar',
+        'name': name,
+        'output': output,
+        'series': series,
+        'cmap': cmap,
+        'vmin': vmin,
+        'vmax': vmax,
+        'dpi': dpi,
+        'figsize': figsize,
+        'title': title,
+        'colorbar': colorbar,
+        'dropzero': dropzero,
+    }
+
+
+def bars_job(table: pd.DataFrame, bars: list, title: str, ylabel: str, output=None,
+             name: str = 'bar chart', width: float = 0.2, dpi: int = 100, figsize=(12, 6)) -> dict:
+    """Describe a grouped bar chart with one group of bars per year.
+
+    Args:
+        table: DataFrame with a 'year' column and one column per bar
+        bars: List of (column, color, label) tuples, drawn left to right
+        title: Chart title
+        ylabel: Y axis label
+        output: Output PNG path (None to only show the figure)
+        name: Figure name used in progress messages
+        width: Width of each bar
+        dpi: Output resolution
+        figsize: Figure size in inches
+
+    Returns:
+        Figure job dictionary for render_figure
+    """
+    return {
+        'kind': 'bars',
+        'name': name,
+        'output': output,
+        'table': table,
+        'bars': bars,
+        'title': title,
+        'ylabel': ylabel,
+        'width': width,
+        'dpi': dpi,
+        'figsize': figsize,
+    }
+
+
+def _draw_calendar(job: dict):
+    """Draw a calendar job onto a new figure."""
+    # pyplot and calplot are imported on first draw so that fully cached
+    # renders never pay for loading them
+    import matplotlib.pyplot as plt
+    import calplot
+
+    fig, _ = calplot.calplot(
+        job['series'],
+        cmap=job['cmap'],
+        vmin=job['vmin'],
+        vmax=job['vmax'],
+        figsize=job['figsize'],
+        colorbar=job['colorbar'],
+        dropzero=job['dropzero'],
+        **CALENDAR_STYLE
+    )
+    if job['title']:
+        plt.suptitle(job['title'], fontsize=20, y=0.98)
+    return fig
+
+
+def _draw_bars(job: dict):
+    """Draw a bar chart job onto a new figure."""
+    import matplotlib.pyplot as plt
+
+    table = job['table']
+    width = job['width']
+
+    fig, ax = plt.subplots(figsize=job['figsize'])
+    for position, (column, color, label) in enumerate(job['bars']):
+        ax.bar(
+            x=table['year'] + width * position,
+            height=table[column],
+            width=width,
+            color=color,
+            label=label
+        )
+
+    ax.set_title(job['title'], fontsize=18)
+    ax.set_xlabel('Year')
+    ax.set_ylabel(job['ylabel'])
+    ax.legend()
+    return fig
+
+
+def _draw_title(job: dict):
+    """Draw a title strip placed above stitched year tiles."""
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=job['figsize'])
+    fig.text(0.5, 0.5, job['title'], fontsize=20, ha='center', va='center')
+    return fig
+
+
+FIGURE_DRAWERS = {
+    'calendar': _draw_calendar,
+    'bars': _draw_bars,
+    'title': _draw_title,
+}
+
+
+def year_tile_jobs(job: dict) -> list:
+    """Split a calendar job into one single-year calendar job per year.
+
+    The series is resampled by day once over its full range, as calplot does,
+    and each tile gets the color limits, zero dropping and colorbar setting
+    of the full series so tiles of different years share one color scale.
+
+    Args:
+        job: Result of calendar_job
+
+    Returns:
+        List of tile jobs without output, oldest year first, preceded by a
+        title job when the calendar has a title
+    """
+    by_day = job['series'].resample('D').agg('sum')
+    # Decide once for all years whether zero days are left out of the scale
+    dropzero = mostly_zero(by_day) if job['dropzero'] is None else job['dropzero']
+    scaled = by_day.replace({0: np.nan}).dropna() if dropzero else by_day
+    vmin = scaled.min() if job['vmin'] is None else job['vmin']
+    vmax = scaled.max() if job['vmax'] is None else job['vmax']
+    colorbar = job['series'].nunique() > 1 if job['colorbar'] is None else job['colorbar']
+    width = 10 + colorbar * 2.5
+
+    tiles = []
+    if job['title']:
+        tiles.append({
+            'kind': 'title',
+            'name': f"{job['name']} title",
+            'output': None,
+            'title': job['title'],
+            'dpi': job['dpi'],
+            'figsize': (width, 0.8),
+        })
+
+    for year, year_series in by_day.groupby(by_day.index.year):
+        tiles.append(calendar_job(
+            year_series,
+            job['cmap'],
+            name=f"{job['name']} {year}",
+            vmin=float(vmin),
+            vmax=float(vmax),
+            dpi=job['dpi'],
+            figsize=(width, 1.7),
+            colorbar=bool(colorbar),
+            dropzero=bool(dropzero)
+        ))
+    return tiles
+
+
+def _stitch_vertically(image_paths: list, output):
+    """Stack PNG images top to bottom, centering narrower ones on white."""
+    import matplotlib.image as mpimg
+
+    images = [mpimg.imread(image_path) for image_path in image_paths]
+    width = max(image.shape[1] for image in images)
+    padded = []
+    for image in images:
+        left = (width - image.shape[1]) // 2
+        right = width - image.shape[1] - left
+        padded.append(np.pad(image, ((0, 0), (left, right), (0, 0)), constant_values=1.0))
+    mpimg.imsave(output, np.vstack(padded))
+
+
+def _render_year_tiles(job: dict, cache_dir: Path = None):
+    """Render a calendar as per-year tiles and stitch them into its output.
+
+    Tiles are cached by content hash like whole figures, so after one new day
+    arrives only the tile of the current year is drawn again.
+
+    Args:
+        job: Calendar job with a PNG output
+        cache_dir: Render cache directory (optional; tiles are discarded without it)
+    """
+    import matplotlib.pyplot as plt
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        tile_dir = Path(cache_dir) / 'tiles' if cache_dir is not None else Path(scratch_dir)
+        tile_dir.mkdir(parents=True, exist_ok=True)
+
+        tile_paths = []
+        for tile in year_tile_jobs(job):
+            tile['output'] = 'tile.png'
+            tile_path = tile_dir / (figure_key(tile) + '.png')
+            if tile_path.exists():
+                # Mark as recently used for prune_render_cache
+                os.utime(tile_path)
+            else:
+                fig = FIGURE_DRAWERS[tile['kind']](tile)
+                fig.savefig(tile_path, bbox_inches='tight', dpi=tile['dpi'])
+                plt.close(fig)
+            tile_paths.append(tile_path)
+
+        _stitch_vertically(tile_paths, job['output'])
+
+
+def _hash_pandas(digest, obj):
+    """Feed values, index and dtypes of a Series or DataFrame into a hash."""
+    digest.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    if isinstance(obj, pd.DataFrame):
+        digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in obj.dtypes.items()]).encode('utf-8'))
+    else:
+        digest.update(str(obj.dtype).encode('utf-8'))
+
+
+def _hash_colormap(digest, cmap):
+    """Feed the lookup table of a colormap, including bad/under/over colors, into a hash."""
+    digest.update(np.asarray(cmap(np.arange(cmap.N)), dtype=np.float64).tobytes())
+    digest.update(np.asarray([cmap.get_bad(), cmap.get_under(), cmap.get_over()], dtype=np.float64).tobytes())
+
+
+def figure_key(job: dict) -> str:
+    """Compute a content hash of everything that affects a rendered figure.
+
+    Covers the plotted data, colormap, color limits, dpi, figure size, text,
+    output format and the versions of the drawing libraries, but not the
+    output path or progress message name.
+
+    Args:
+        job: Result of calendar_job or bars_job
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+
+    settings = {
+        key: value for key, value in job.items()
+        if key not in ('name', 'output', 'series', 'cmap', 'table')
+    }
+    settings['format'] = Path(job['output']).suffix.lower() if job['output'] else None
+    settings['versions'] = [RENDER_CACHE_VERSION, matplotlib.__version__, version('calplot')]
+    if job['kind'] == 'calendar':
+        settings['style'] = CALENDAR_STYLE
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+
+    if 'series' in job:
+        _hash_pandas(digest, job['series'])
+    if 'cmap' in job:
+        _hash_colormap(digest, job['cmap'])
+    if 'table' in job:
+        _hash_pandas(digest, job['table'])
+
+    return digest.hexdigest()
+
+
+def _cached_render_path(job: dict, cache_dir: Path) -> Path:
+    """Get render cache path of a job, e.g. <cache_dir>/<figure key>.png."""
+    return Path(cache_dir) / (figure_key(job) + Path(job['output']).suffix)
+
+
+def _reuse_cached_render(job: dict, cache_dir: Path) -> bool:
+    """Copy a cached render to the job output if one exists.
+
+    Args:
+        job: Figure job with an output path
+        cache_dir: Render cache directory
+
+    Returns:
+        True when the output was taken from the cache
+    """
+    cache_path = _cached_render_path(job, cache_dir)
+    try:
+        shutil.copyfile(cache_path, job['output'])
+    except FileNotFoundError:
+        # Not cached, or pruned by another process in the meantime
+        return False
+
+    # Mark as recently used for prune_render_cache
+    os.utime(cache_path)
+    print(f"Reused cached {job['name']} for {job['output']}")
+    return True
+
+
+def prune_render_cache(cache_dir: Path, max_bytes: int = RENDER_CACHE_MAX_BYTES) -> int:
+    """Delete the least recently used cached renders beyond a total size.
+
+    Renders and year tiles get a new mtime whenever they are written or
+    reused, so files used by recent runs are kept.
+
+    Args:
+        cache_dir: Render cache directory
+        max_bytes: Total size of the files to keep
+
+    Returns:
+        Number of deleted files
+    """
+    entries = []
+    for directory, _, names in os.walk(cache_dir):
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    removed = 0
+    total = 0
+    for _, size, path in sorted(entries, reverse=True):
+        total += size
+        if total > max_bytes:
+            # Another process may have pruned it already
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def _store_cached_render(job: dict, cache_dir: Path):
+    """Copy a freshly written output into the render cache."""
+    cache_path = _cached_render_path(job, cache_dir)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(job['output'], cache_path)
+
+
+def _tileable(job: dict) -> bool:
+    """Check whether a job can be rendered as stitched PNG year tiles."""
+    return (
+        job['kind'] == 'calendar'
+        and job['figsize'] is None
+        and Path(job['output']).suffix.lower() == '.png'
+        and len(job['series']) > 0
+    )
+
+
+def render_figure(job: dict, show: bool = False, cache_dir: Path = None):
+    """Draw a figure job, save it and optionally show it.
+
+    With a cache directory, a figure whose content hash was rendered before
+    is copied from the cache without building a matplotlib figure. Calendar
+    jobs with an .svg output are written by the lightweight SVG writer, those
+    with backend 'native' as NumPy-rendered images without text, and those
+    marked with 'year_tiles' as stitched per-year tiles.
+
+    Args:
+        job: Result of calendar_job or bars_job
+        show: Display the figure instead of closing it
+        cache_dir: Render cache directory (optional, not used when showing)
+
+    Returns:
+        Path of the written file, or None if the job has no output
+    """
+    if not job['output'] and not show:
+        return None
+
+    use_cache = cache_dir is not None and job['output'] and not show
+    if use_cache and _reuse_cached_render(job, cache_dir):
+        return job['output']
+
+    if job['kind'] == 'calendar' and not show and Path(job['output']).suffix.lower() == '.svg':
+        write_calendar_svg(job['series'], job['cmap'], job['output'], vmin=job['vmin'], vmax=job['vmax'],
+                           textformat=CALENDAR_STYLE['textformat'], textcolor=CALENDAR_STYLE['textcolor'],
+                           title=job['title'])
+        print(f"Saved {job['name']} to {job['output']}")
+        if use_cache:
+            _store_cached_render(job, cache_dir)
+        return job['output']
+
+    if job.get('backend') == 'native' and not show and _tileable(job):
+        write_calendar_image(job['series'], job['cmap'], job['output'],
+                             vmin=job['vmin'], vmax=job['vmax'], dpi=job['dpi'])
+        print(f"Saved {job['name']} to {job['output']}")
+        if use_cache:
+            _store_cached_render(job, cache_dir)
+        return job['output']
+
+    if job.get('year_tiles') and not show and _tileable(job):
+        _render_year_tiles(job, cache_dir)
+        print(f"Saved {job['name']} to {job['output']}")
+        if use_cache:
+            _store_cached_render(job, cache_dir)
+        return job['output']
+
+    fig = FIGURE_DRAWERS[job['kind']](job)
+
+    if job['output']:
+        fig.savefig(job['output'], bbox_inches='tight', dpi=job['dpi'])
+        print(f"Saved {job['name']} to {job['output']}")
+
+    if use_cache:
+        _store_cached_render(job, cache_dir)
+
+    import matplotlib.pyplot as plt
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+    return job['output']
+
+
+def _use_agg_backend():
+    """Switch a render worker to the non-interactive Agg backend."""
+    matplotlib.use('Agg')
+
+
+def render_figures(jobs: list, show: bool = False, workers: int = None, cache_dir: Path = None,
+                   year_tiles: bool = False, backend: str = 'calplot') -> list:
+    """Render figure jobs serially or across a process pool.
+
+    Figures are independent, so with several workers a batch takes about as
+    long as its slowest figure. Workers render with the Agg backend; showing
+    figures always happens serially in this process. Cached figures are
+    copied before any worker is started.
+
+    Args:
+        jobs: List of figure jobs
+        show: Display each figure instead of closing it
+        workers: Number of worker processes (None or 1 renders in this process)
+        cache_dir: Render cache directory, pruned to RENDER_CACHE_MAX_BYTES
+            afterwards (optional, not used when showing)
+        year_tiles: Render calendars as cached per-year tiles stitched together
+        backend: Calendar renderer, 'calplot' or 'native' (NumPy image, no text labels)
+
+    Returns:
+        List of written file paths
+    """
+    jobs = [job for job in jobs if job['output'] or show]
+    if year_tiles:
+        jobs = [dict(job, year_tiles=True) if job['kind'] == 'calendar' else job for job in jobs]
+    if backend != 'calplot':
+        jobs = [dict(job, backend=backend) if job['kind'] == 'calendar' else job for job in jobs]
+
+    written = []
+    if cache_dir is not None and not show:
+        pending = []
+        for job in jobs:
+            if _reuse_cached_render(job, cache_dir):
+                written.append(job['output'])
+            else:
+                pending.append(job)
+        jobs = pending
+
+    render = partial(render_figure, show=show, cache_dir=cache_dir)
+    if workers and workers > 1 and len(jobs) > 1 and not show:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_use_agg_backend) as executor:
+            written += executor.map(render, jobs)
+    else:
+        written += [render(job) for job in jobs]
+
+    if cache_dir is not None and not show and Path(cache_dir).is_dir():
+        removed = prune_render_cache(cache_dir)
+        if removed:
+            print(f"Pruned {removed} least recently used files from {cache_dir}")
+
+    return [output for output in written if output]
@@ -0,0 +1,195 @@
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from utils.cache_utils import read_frame
+from utils.feature_utils import categorize
+
+
+# Rollup rows count the days of a metric's bin per month; rows with month 0
+# hold the total of the year
+ROLLUP_COLUMNS = ['metric', 'year', 'month', 'bin', 'days']
+
+
+def rollup_path_for(tsv_path: Path) -> Path:
+    """Get the rollup table stored next to a prepared dataset.
+
+    Args:
+        tsv_path: Prepared TSV, e.g. data/my_garmin_data.tsv
+
+    Returns:
+        Path like data/my_garmin_data.rollup.tsv
+    """
+    tsv_path = Path(tsv_path)
+    return tsv_path.with_name(tsv_path.stem + '.rollup.tsv')
+
+
+def month_numbers(dates) -> np.ndarray:
+    """Months since January 1970 of each date.
+
+    Args:
+        dates: Series of datetime64 dates
+
+    Returns:
+        int64 array
+    """
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[M]').view(np.int64)
+
+
+def count_months(df: pd.DataFrame, metrics: dict, months: np.ndarray = None) -> pd.DataFrame:
+    """Count days per metric, month and bin.
+
+    Args:
+        df: DataFrame with a 'date' column and the metrics' value columns
+        metrics: Metric name -> entry with 'column', 'bins' and 'missing_last'
+            (see plot_utils.METRICS)
+        months: Only count days in these months, as from month_numbers
+            (default: all days)
+
+    Returns:
+        DataFrame with ROLLUP_COLUMNS; bins without days have no row
+    """
+    if df.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object if column == 'metric' else np.int64)
+                             for column in ROLLUP_COLUMNS})
+
+    day_months = month_numbers(df['date'])
+    if months is not None:
+        selected = np.isin(day_months, months)
+        df, day_months = df[selected], day_months[selected]
+
+    tables = []
+    for name, metric in metrics.items():
+        bins = categorize(df[metric['column']], metric['bins'], metric['missing_last'])
+        bins = bins.to_numpy(dtype=np.float64, na_value=np.nan)
+        binned = ~np.isnan(bins)
+
+        # One key per (month, bin) pair, so a single unique() counts them all
+        bin_count = len(metric['bins']) + 1
+        keys = day_months[binned] * bin_count + bins[binned].astype(np.int64) - 1
+        keys, days = np.unique(keys, return_counts=True)
+
+        month_index = keys // bin_count + 1970 * 12
+        tables.append(pd.DataFrame({
+            'metric': name,
+            'year': month_index // 12,
+            'month': month_index % 12 + 1,
+            'bin': keys % bin_count + 1,
+            'days': days.astype(np.int64),
+        }))
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def add_years(monthly: pd.DataFrame) -> pd.DataFrame:
+    """Add yearly totals to monthly rollup rows.
+
+    Args:
+        monthly: Rollup rows of months
+
+    Returns:
+        Rollup with month and year rows, sorted by metric, year, month and bin
+    """
+    yearly = monthly.groupby(['metric', 'year', 'bin'], as_index=False)['days'].sum()
+    yearly.insert(2, 'month', np.int64(0))
+
+    rollup = pd.concat([monthly, yearly[ROLLUP_COLUMNS]], ignore_index=True)
+    return rollup.sort_values(['metric', 'year', 'month', 'bin'], ignore_index=True)
+
+
+def build_rollup(df: pd.DataFrame, metrics: dict) -> pd.DataFrame:
+    """Compute year x bin and month x bin day counts of a dataset.
+
+    Args:
+        df: Prepared DataFrame
+        metrics: Metric name -> entry with 'column', 'bins' and 'missing_last'
+
+    Returns:
+        Rollup DataFrame with ROLLUP_COLUMNS
+    """
+    return add_years(count_months(df, metrics))
+
+
+def changed_months(df: pd.DataFrame, previous: pd.DataFrame, new: pd.DataFrame) -> np.ndarray:
+    """Months whose days an incremental update may have changed.
+
+    Args:
+        df: Dataset after the update
+        previous: Dataset before the update
+        new: Rows merged into it
+
+    Returns:
+        Sorted array of month numbers: months of new rows and of days that
+        were not in previous, e.g. gaps filled in between; empty when
+        neither has any
+    """
+    # Loaders may return a frame without columns when no file had data
+    new_dates = new['date'] if 'date' in new.columns else pd.Series(dtype='datetime64[us]')
+    if df.empty:
+        return month_numbers(new_dates)
+    if 'date' not in previous.columns:
+        return np.union1d(month_numbers(new_dates), month_numbers(df['date']))
+
+    added = ~pd.to_datetime(df['date']).isin(pd.to_datetime(previous['date']))
+    return np.union1d(month_numbers(new_dates), month_numbers(df['date'][added]))
+
+
+def update_rollup(rollup: pd.DataFrame, df: pd.DataFrame, metrics: dict, months: np.ndarray) -> pd.DataFrame:
+    """Recount only the given months and the years containing them.
+
+    Args:
+        rollup: Previous rollup of the dataset
+        df: Dataset after the update
+        metrics: Metric name -> entry with 'column', 'bins' and 'missing_last'
+        months: Month numbers to recount, as from changed_months
+
+    Returns:
+        Updated rollup DataFrame
+    """
+    monthly = rollup[(rollup['month'] > 0) & rollup['metric'].isin(list(metrics))]
+    kept = ~np.isin((monthly['year'].to_numpy() - 1970) * 12 + monthly['month'].to_numpy() - 1, months)
+    recounted = count_months(df, metrics, months=months)
+    return add_years(pd.concat([monthly[kept], recounted], ignore_index=True))
+
+
+def read_rollup(tsv_path: Path):
+    """Read the rollup of a prepared dataset if it is current.
+
+    Args:
+        tsv_path: Prepared TSV path
+
+    Returns:
+        Rollup DataFrame, or None when it is missing or older than the TSV
+    """
+    tsv_path = Path(tsv_path)
+    rollup_path = rollup_path_for(tsv_path)
+    if not rollup_path.exists() or not tsv_path.exists():
+        return None
+    # The prepare scripts write the rollup right after the dataset
+    if os.stat(rollup_path).st_mtime_ns < os.stat(tsv_path).st_mtime_ns:
+        return None
+    return read_frame(rollup_path)
+
+
+def year_table(rollup: pd.DataFrame, name: str, bin_count: int) -> pd.DataFrame:
+    """Yearly day counts of one metric as a year x bin table.
+
+    Args:
+        rollup: Rollup DataFrame
+        name: Metric name
+        bin_count: Number of bins of the metric
+
+    Returns:
+        DataFrame with 'year' and one 'bin_<n>' column per bin, with zeros
+        for bins without days; years without days are left out
+    """
+    yearly = rollup[(rollup['metric'] == name) & (rollup['month'] == 0)]
+    years, year_index = np.unique(yearly['year'].to_numpy(dtype=np.int64), return_inverse=True)
+
+    counts = np.zeros((len(years), bin_count), dtype=np.int64)
+    counts[year_index, yearly['bin'].to_numpy(dtype=np.int64) - 1] = yearly['days'].to_numpy(dtype=np.int64)
+
+    table = pd.DataFrame(counts, columns=[f'bin_{n}' for n in range(1, bin_count + 1)])
+    table.insert(0, 'year', years)
+    return table
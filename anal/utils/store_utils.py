@@ -0,0 +1,152 @@
+from pathlib import Path
+import sqlite3
+import numpy as np
+import pandas as pd
+
+
+# Columns of the daily fact table and their SQLite types, one per metric
+DAILY_COLUMNS = {
+    # garmin_utils: steps, heart rate and floors (01-prepare-steps.py)
+    'steps_cnt': 'REAL',
+    'min_hr': 'REAL',
+    'min_avg_hr': 'REAL',
+    'max_avg_hr': 'REAL',
+    'max_hr': 'REAL',
+    'resting_hr': 'REAL',
+    'floors_ascended_m': 'REAL',
+    'floors_climbed': 'REAL',
+    # garmin_utils: sleep (01-prepare-steps.py, 02-prepare-sleep.py)
+    'sleep_start': 'TEXT',
+    'sleep_end': 'TEXT',
+    'sleep_duration_h': 'REAL',
+    # garmin_utils: activities and stress (03-prepare-activities.py, 04-prepare-stress.py)
+    'activity_count': 'INTEGER',
+    'avg_stress_level': 'REAL',
+    'max_stress_level': 'REAL',
+    # nomie_utils: alcohol/substance entries per day (03-alco-data.py)
+    'alcohol_count': 'INTEGER',
+    # toggl_utils: tracked hours per day (04-business-hours.py)
+    'business_hours': 'REAL',
+}
+
+# Columns stored as 'YYYY-MM-DD HH:MM:SS' text and read back as datetimes
+TIMESTAMP_COLUMNS = ['sleep_start', 'sleep_end']
+
+
+def connect_store(db_path: Path) -> sqlite3.Connection:
+    """Open the daily fact store, creating or extending its table as needed.
+
+    Days are the primary key of a WITHOUT ROWID table, so rows are stored
+    in date order and date range queries read only the rows they return.
+
+    Args:
+        db_path: SQLite database file
+
+    Returns:
+        Open connection
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    # Loaders running in parallel (run-pipeline.py --jobs) wait for each other's writes
+    conn = sqlite3.connect(db_path, timeout=60)
+
+    conn.execute("CREATE TABLE IF NOT EXISTS daily (date TEXT PRIMARY KEY) WITHOUT ROWID")
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(daily)")}
+    for column, sql_type in DAILY_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE daily ADD COLUMN {column} {sql_type}")
+    conn.commit()
+    return conn
+
+
+def _store_values(values: pd.Series, column: str) -> list:
+    """Convert a column to Python values SQLite accepts, None for missing."""
+    if column in TIMESTAMP_COLUMNS:
+        values = pd.to_datetime(values).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+    # NumPy scalars are not bound by sqlite3
+    convert = {'INTEGER': int, 'REAL': float}.get(DAILY_COLUMNS[column], str)
+    return [None if pd.isna(value) else convert(value) for value in values.tolist()]
+
+
+def upsert_daily(db_path: Path, df: pd.DataFrame) -> int:
+    """Insert or update days in the store.
+
+    Only the metric columns present in df are written. Missing values do
+    not overwrite stored ones, so loaders of different sources (and partial
+    incremental updates) can write the same days independently.
+
+    Args:
+        db_path: SQLite database file
+        df: DataFrame with a 'date' column and any columns of DAILY_COLUMNS
+
+    Returns:
+        Number of days written
+    """
+    columns = [column for column in df.columns if column in DAILY_COLUMNS]
+    if df.empty or not columns:
+        return 0
+
+    dates = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d').tolist()
+    rows = zip(dates, *(_store_values(df[column], column) for column in columns))
+
+    assignments = ', '.join(f"{column} = COALESCE(excluded.{column}, daily.{column})" for column in columns)
+    query = (
+        f"INSERT INTO daily (date, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 1))}) "
+        f"ON CONFLICT(date) DO UPDATE SET {assignments}"
+    )
+
+    conn = connect_store(db_path)
+    try:
+        with conn:
+            conn.executemany(query, rows)
+    finally:
+        conn.close()
+    return len(df)
+
+
+def read_daily(db_path: Path, columns: list = None, start=None, end=None) -> pd.DataFrame:
+    """Read a date range of the store.
+
+    Args:
+        db_path: SQLite database file
+        columns: Metric columns to read (default: all)
+        start: First date to read, inclusive (optional)
+        end: Last date to read, inclusive (optional)
+
+    Returns:
+        DataFrame with 'date' and the requested columns, sorted by date;
+        days where all requested columns are missing are left out
+    """
+    columns = list(columns or DAILY_COLUMNS)
+    unknown = [column for column in columns if column not in DAILY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown store columns: {', '.join(unknown)}")
+
+    conditions = ['(' + ' OR '.join(f"{column} IS NOT NULL" for column in columns) + ')']
+    params = []
+    if start is not None:
+        conditions.append("date >= ?")
+        params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+    if end is not None:
+        conditions.append("date <= ?")
+        params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+
+    query = f"SELECT date, {', '.join(columns)} FROM daily WHERE {' AND '.join(conditions)} ORDER BY date"
+
+    conn = connect_store(db_path)
+    try:
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+    df['date'] = pd.to_datetime(df['date'])
+    for column in columns:
+        if column in TIMESTAMP_COLUMNS:
+            df[column] = pd.to_datetime(df[column])
+        elif DAILY_COLUMNS[column] == 'REAL':
+            df[column] = df[column].astype(np.float64)
+        elif DAILY_COLUMNS[column] == 'INTEGER':
+            # int64, or float64 when some days are NULL
+            df[column] = pd.to_numeric(df[column]).astype(np.int64 if df[column].notna().all() else np.float64)
+    return df
@@ -1,7 +1,21 @@
+import hashlib
+import json
 import os
+import pickle
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from utils.manifest_utils import file_digest
+
+
+# Columns of the detailed export that are actually used
+TOGGL_COLUMNS = ['Start date', 'Client', 'Duration']
+TOGGL_DTYPES = {'Client': 'category', 'Duration': 'str'}
+
+# Bump when the layout of cached daily totals changes to invalidate old caches
+TOGGL_CACHE_VERSION = 1
+
 
 def parse_duration(duration_string: str) -> float:
     """Parse Toggl duration format (HH:MM:SS) to hours.
@@ -17,13 +31,140 @@ def parse_duration(duration_string: str) -> float:
     return duration
 
 
-def load_toggl_hours(toggl_path: Path, clients_exclude=None, clients_include=None) -> pd.DataFrame:
+def parse_durations(durations: pd.Series) -> pd.Series:
+    """Parse a column of Toggl durations (HH:MM:SS) to hours.
+
+    Vectorized equivalent of parse_duration.
+
+    Args:
+        durations: Series of strings in format 'HH:MM:SS'
+
+    Returns:
+        Series of durations in hours as float, empty for no durations
+    """
+    # Unlike str.split(expand=True), extract keeps its columns on empty input
+    elements = durations.str.extract(r'(?P<h>\d+):(?P<m>\d+):(?P<s>\d+)').astype('int64')
+    return elements['h'] + elements['m'] / 60 + elements['s'] / (60 * 60)
+
+
+def normalize_day_hours(hours: pd.Series) -> pd.Series:
+    """Fold daily totals over 24h back into the 0-24h range.
+
+    Same result as subtracting 24 until no value exceeds 24, done in one pass.
+
+    Args:
+        hours: Series of daily hours
+
+    Returns:
+        Series with values > 24 reduced by the needed multiple of 24
+    """
+    excess_days = np.ceil(hours / 24) - 1
+    return hours.where(hours <= 24, hours - 24 * excess_days)
+
+
+def _load_toggl_file(toggl_file: Path, clients_exclude=None, clients_include=None) -> pd.DataFrame:
+    """Load one Toggl CSV export and aggregate it to daily hours.
+
+    Args:
+        toggl_file: Toggl CSV file
+        clients_exclude: List of client names to exclude (optional)
+        clients_include: List of client names to include only (optional)
+
+    Returns:
+        DataFrame with columns: date, duration_h
+    """
+    df = pd.read_csv(
+        toggl_file,
+        usecols=lambda column: column in TOGGL_COLUMNS,
+        dtype=TOGGL_DTYPES,
+        parse_dates=['Start date']
+    )
+
+    # Filter clients
+    if 'Client' in df.columns:
+        # Always filter out clients starting with "~"
+        df = df[~df['Client'].astype(str).str.startswith('~')]
+
+        # Apply include filter if specified
+        if clients_include is not None:
+            df = df[df['Client'].isin(clients_include)]
+
+        # Apply exclude filter if specified
+        if clients_exclude is not None:
+            df = df[~df['Client'].isin(clients_exclude)]
+
+    df = df.assign(duration_h=parse_durations(df['Duration']))
+    duration_each_day = pd.DataFrame(
+        df.groupby(['Start date'])['duration_h'].sum()
+    ).reset_index()
+    return duration_each_day.rename(columns={'Start date': 'date'})
+
+
+def _toggl_cache_path(cache_dir: Path, digest: str, clients_exclude=None, clients_include=None) -> Path:
+    """Get cache path for the daily totals of one file under given client filters.
+
+    Args:
+        cache_dir: Directory holding cached daily totals
+        digest: SHA-256 of the Toggl CSV file
+        clients_exclude: List of client names to exclude (optional)
+        clients_include: List of client names to include only (optional)
+
+    Returns:
+        Path like <cache_dir>/<digest>-<filters digest>.pkl
+    """
+    filters = json.dumps({
+        'exclude': sorted(clients_exclude) if clients_exclude is not None else None,
+        'include': sorted(clients_include) if clients_include is not None else None,
+    }, sort_keys=True)
+    filters_digest = hashlib.sha256(filters.encode('utf-8')).hexdigest()[:16]
+    return Path(cache_dir) / f'{digest}-{filters_digest}.pkl'
+
+
+def _load_toggl_file_cached(toggl_file: Path, cache_dir: Path, clients_exclude=None, clients_include=None) -> pd.DataFrame:
+    """Load daily totals of one Toggl CSV file, reusing a cached result.
+
+    The cache is keyed by the file content hash and the client filters, so
+    exports of past years are parsed once and only changed files are re-read.
+
+    Args:
+        toggl_file: Toggl CSV file
+        cache_dir: Directory holding cached daily totals
+        clients_exclude: List of client names to exclude (optional)
+        clients_include: List of client names to include only (optional)
+
+    Returns:
+        DataFrame with columns: date, duration_h
+    """
+    cache_path = _toggl_cache_path(cache_dir, file_digest(toggl_file), clients_exclude, clients_include)
+
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as f:
+                payload = pickle.load(f)
+            if payload.get('version') == TOGGL_CACHE_VERSION:
+                return payload['frame']
+        except Exception:
+            # Unreadable cache; parse the file again
+            pass
+
+    duration_each_day = _load_toggl_file(toggl_file, clients_exclude, clients_include)
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump({'version': TOGGL_CACHE_VERSION, 'frame': duration_each_day}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+
+    return duration_each_day
+
+
+def load_toggl_hours(toggl_path: Path, clients_exclude=None, clients_include=None, cache_dir: Path = None) -> pd.DataFrame:
     """Load Toggl time tracking data and aggregate to daily hours.
 
     Args:
         toggl_path: Path to toggl directory with CSV files
         clients_exclude: List of client names to exclude (optional)
         clients_include: List of client names to include only (optional)
+        cache_dir: Directory to cache per-file daily totals in (optional)
 
     Returns:
         DataFrame with columns: date, duration_h
@@ -34,35 +175,23 @@ def load_toggl_hours(toggl_path: Path, clients_exclude=None, clients_include=Non
         if f.startswith('Toggl')
     ])
 
-    all_dates_business_hours = pd.DataFrame()
-
-    for each_toggl_year_file in toggl_files:
-        df = pd.read_csv(each_toggl_year_file, parse_dates=['Start date'])
-
-        # Filter clients
-        if 'Client' in df.columns:
-            # Always filter out clients starting with "~"
-            df = df[~df['Client'].astype(str).str.startswith('~')]
-
-            # Apply include filter if specified
-            if clients_include is not None:
-                df = df[df['Client'].isin(clients_include)]
-
-            # Apply exclude filter if specified
-            if clients_exclude is not None:
-                df = df[~df['Client'].isin(clients_exclude)]
-
-        df['duration_h'] = df['Duration'].map(parse_duration)
-        duration_each_day = pd.DataFrame(
-            df.groupby(['Start date'])['duration_h'].sum()
-        ).reset_index()
-        duration_each_day = duration_each_day.rename(columns={'Start date': 'date'})
-        all_dates_business_hours = pd.concat([all_dates_business_hours, duration_each_day])
+    # Collect per-file daily totals and concatenate once
+    if cache_dir is not None:
+        daily_frames = [
+            _load_toggl_file_cached(each_toggl_year_file, cache_dir, clients_exclude, clients_include)
+            for each_toggl_year_file in toggl_files
+        ]
+    else:
+        daily_frames = [
+            _load_toggl_file(each_toggl_year_file, clients_exclude, clients_include)
+            for each_toggl_year_file in toggl_files
+        ]
+    if not daily_frames:
+        return pd.DataFrame({'date': pd.Series(dtype='datetime64[ns]'), 'duration_h': pd.Series(dtype=float)})
+
+    all_dates_business_hours = pd.concat(daily_frames)
 
     # Normalize durations > 24h
-    while all_dates_business_hours.duration_h.max() > 24:
-        all_dates_business_hours['duration_h'] = all_dates_business_hours['duration_h'].map(
-            lambda x: x - 24 if x > 24 else x
-        )
+    all_dates_business_hours['duration_h'] = normalize_day_hours(all_dates_business_hours['duration_h'])
 
     return all_dates_business_hours
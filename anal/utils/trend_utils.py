@@ -0,0 +1,192 @@
+import operator
+import numpy as np
+import pandas as pd
+
+
+# Rolling mean windows in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+# Days compared by week-over-week deltas
+WEEK = 7
+
+# Comparison operators usable in streak tests
+STREAK_OPERATORS = {
+    '>=': operator.ge,
+    '>': operator.gt,
+    '==': operator.eq,
+    '<=': operator.le,
+    '<': operator.lt,
+}
+
+# Runs of consecutive days meeting a condition; fill_value replaces missing
+# values before the test (no Nomie entry on a day means no alcohol)
+STREAKS = {
+    'steps_10k_streak': {'column': 'steps_cnt', 'test': ('>=', 10000), 'fill_value': None},
+    'alcohol_free_streak': {'column': 'alcohol_count', 'test': ('==', 0), 'fill_value': 0},
+}
+
+
+def trend_columns(df: pd.DataFrame) -> list:
+    """Metric columns rolling means and deltas are computed for.
+
+    Args:
+        df: Daily DataFrame
+
+    Returns:
+        Names of all numeric columns except 'date'
+    """
+    return [
+        column for column in df.columns
+        if column != 'date' and pd.api.types.is_numeric_dtype(df[column])
+        and not pd.api.types.is_bool_dtype(df[column])
+    ]
+
+
+def window_means(sums: np.ndarray, counts: np.ndarray, window: int) -> np.ndarray:
+    """Means over trailing windows from cumulative sums.
+
+    Args:
+        sums: Cumulative sums of values with a leading row of zeros, shape (days + 1, metrics)
+        counts: Cumulative counts of present values, same shape
+        window: Window length in rows
+
+    Returns:
+        Array of shape (days, metrics); NaN where a window has no values
+    """
+    days = len(sums) - 1
+    ends = np.arange(1, days + 1)
+    starts = np.maximum(ends - window, 0)
+
+    window_sums = sums[ends] - sums[starts]
+    window_counts = counts[ends] - counts[starts]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+def streak_lengths(condition: np.ndarray, carry=0) -> np.ndarray:
+    """Length of the run of days meeting a condition that ends on each day.
+
+    Args:
+        condition: Boolean array of shape (days,) or (days, streaks)
+        carry: Length of the runs ending the day before the first row, e.g.
+            from a previous computation (scalar or one per streak)
+
+    Returns:
+        int64 array shaped like condition, 0 on days not meeting it
+    """
+    rows = np.arange(len(condition)).reshape((-1,) + (1,) * (condition.ndim - 1))
+
+    # Row of the latest day not meeting the condition, -1 before the first one
+    last_break = np.maximum.accumulate(np.where(condition, -1, rows), axis=0)
+    lengths = rows - last_break
+    return np.where(last_break < 0, lengths + np.asarray(carry, dtype=np.int64), lengths)
+
+
+def compute_trends(daily: pd.DataFrame, columns: list = None, windows: tuple = ROLLING_WINDOWS,
+                   streaks: dict = None, carry: dict = None) -> pd.DataFrame:
+    """Compute rolling means, week-over-week deltas and streaks in one pass.
+
+    All metrics are stacked into one matrix, and each window's sums and
+    counts are differences of a single cumulative sum, so the cost is
+    O(days x metrics) regardless of the number and length of the windows.
+    A rolling mean is the mean of the values present in the trailing
+    window, like Series.rolling(window, min_periods=1).mean().
+
+    Args:
+        daily: DataFrame with a 'date' column and one row per consecutive
+            day, e.g. from daily_utils.join_daily
+        columns: Metric columns (default: trend_columns(daily))
+        windows: Rolling mean windows in days
+        streaks: Streak definitions like STREAKS (default: those whose
+            column is in daily)
+        carry: Streak name -> length of the streak ending the day before
+            the first row, to continue a previous computation
+
+    Returns:
+        DataFrame with 'date', '<metric>_mean_<n>d' per metric and window,
+        '<metric>_wow_delta' (7-day mean minus the one a week earlier) per
+        metric and one column per streak
+    """
+    columns = trend_columns(daily) if columns is None else list(columns)
+    if streaks is None:
+        streaks = {name: spec for name, spec in STREAKS.items() if spec['column'] in daily.columns}
+    carry = carry or {}
+
+    values = daily[columns].to_numpy(dtype=np.float64, na_value=np.nan).reshape(len(daily), len(columns))
+    present = ~np.isnan(values)
+
+    # Leading zero row, so window sums are plain differences
+    sums = np.zeros((len(daily) + 1, len(columns)))
+    counts = np.zeros((len(daily) + 1, len(columns)), dtype=np.int64)
+    np.cumsum(np.where(present, values, 0.0), axis=0, out=sums[1:])
+    np.cumsum(present, axis=0, out=counts[1:])
+
+    means = {window: window_means(sums, counts, window) for window in sorted(set(windows) | {WEEK})}
+    weekly = means[WEEK]
+    deltas = np.full_like(weekly, np.nan)
+    deltas[WEEK:] = weekly[WEEK:] - weekly[:-WEEK]
+
+    result = {'date': daily['date'].to_numpy()}
+    for index, column in enumerate(columns):
+        for window in windows:
+            result[f'{column}_mean_{window}d'] = means[window][:, index]
+        result[f'{column}_wow_delta'] = deltas[:, index]
+
+    if streaks:
+        conditions = []
+        for spec in streaks.values():
+            series = daily[spec['column']]
+            if spec['fill_value'] is not None:
+                series = series.fillna(spec['fill_value'])
+            test, threshold = spec['test']
+            conditions.append(STREAK_OPERATORS[test](series, threshold).to_numpy(dtype=bool, na_value=False))
+        lengths = streak_lengths(
+            np.column_stack(conditions), carry=[carry.get(name, 0) for name in streaks]
+        )
+        for index, name in enumerate(streaks):
+            result[name] = lengths[:, index]
+
+    return pd.DataFrame(result)
+
+
+def update_trends(trends: pd.DataFrame, daily: pd.DataFrame, since=None, **kwargs) -> pd.DataFrame:
+    """Extend previously computed trends after days were appended.
+
+    Only days from `since` on are recomputed, from the trailing window of
+    days before them and the streak lengths on the day before; earlier
+    rows are reused. Falls back to compute_trends when the trends do not
+    fit the daily data.
+
+    Args:
+        trends: Result of a previous compute_trends or update_trends call
+        daily: Daily DataFrame covering at least the days of trends
+        since: First day that may have changed (default: last day of
+            trends, whose data may have been partial)
+        **kwargs: Arguments of compute_trends, as used for trends
+
+    Returns:
+        Trends for all days of daily
+    """
+    dates = pd.to_datetime(daily['date'])
+    if (trends.empty or len(daily) < len(trends)
+            or dates.iloc[0] != trends['date'].iloc[0] or dates.iloc[len(trends) - 1] != trends['date'].iloc[-1]):
+        return compute_trends(daily, **kwargs)
+
+    since = pd.Timestamp(since if since is not None else trends['date'].iloc[-1])
+    first = int(np.searchsorted(dates.to_numpy(), since.to_datetime64()))
+    first = min(first, len(trends))
+
+    # Rows the windows and deltas of the first recomputed day look back on
+    lookback = max(max(kwargs.get('windows', ROLLING_WINDOWS)), 2 * WEEK) - 1
+    start = max(first - lookback, 0)
+
+    carry = None
+    if start > 0:
+        previous = trends.iloc[start - 1]
+        carry = {name: int(previous[name]) for name in kwargs.get('streaks') or STREAKS if name in trends.columns}
+
+    tail = compute_trends(daily.iloc[start:].reset_index(drop=True), carry=carry, **kwargs)
+    if list(tail.columns) != list(trends.columns):
+        return compute_trends(daily, **kwargs)
+
+    return pd.concat([trends.iloc[:first], tail.iloc[first - start:]], ignore_index=True)
@@ -5,33 +5,84 @@ import argparse
 from pathlib import Path
 import sys
 
-import pandas as pd
-
 # Add anal/utils directory to path to import utils
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'anal'))
 
-from utils.garmin_utils import load_garmin_steps, load_garmin_sleep
+from utils.cache_utils import write_frame, read_frame
+from utils.daily_utils import join_daily, densify
+from utils.garmin_utils import (
+    load_garmin_uds, load_garmin_steps, load_garmin_sleep, load_garmin_stress,
+    list_uds_files, list_sleep_files
+)
+from utils.manifest_utils import (
+    manifest_path_for, load_manifest, save_manifest, scan_files, merge_by_date
+)
+from utils.plot_utils import rollup_options, write_rollups
+from utils.store_utils import upsert_daily
 
 
 def main(args):
     """Main execution function."""
     garmin_path = Path(args.garmin_path)
     output_path = Path(args.output)
+    stress_output_path = Path(args.stress_output) if args.stress_output else None
+
+    # Decide which input files need parsing
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    options = {
+        'timezone_offset': args.timezone_offset, 'stress_output': args.stress_output, 'store': args.store,
+        'rollups': rollup_options('garmin', 'stress'),
+    }
+    uds_files, uds_entries = scan_files(list_uds_files(garmin_path), manifest)
+    sleep_files, sleep_entries = scan_files(list_sleep_files(garmin_path), manifest)
+
+    incremental = (
+        args.incremental
+        and output_path.exists()
+        and (stress_output_path is None or stress_output_path.exists())
+        and manifest['options'] == options
+    )
+    if incremental:
+        if not uds_files and not sleep_files:
+            print(f"No new or changed Garmin files, {output_path} is up to date")
+            return
+        print(f"Incremental update: {len(uds_files)} UDS and {len(sleep_files)} sleep files changed")
+    else:
+        uds_files = None
+        sleep_files = None
 
-    print("Loading Garmin steps data...")
-    df_steps = load_garmin_steps(garmin_path)
+    print("Loading Garmin daily summary (UDS) data...")
+    df_uds = load_garmin_uds(garmin_path, workers=args.jobs, files=uds_files, stream=args.stream)
+    df_steps = load_garmin_steps(garmin_path, uds=df_uds)
     print(f"Loaded {len(df_steps)} step records")
 
+    if stress_output_path:
+        # Stress comes from the same UDS records, so reuse the scan
+        df_stress = load_garmin_stress(garmin_path, uds=df_uds)
+        if args.store:
+            print(f"Upserting {upsert_daily(args.store, df_stress)} stress days into {args.store}")
+        df_stress_previous, df_stress_new = None, df_stress
+        if incremental:
+            df_stress_previous = read_frame(stress_output_path, parse_dates=['date'])
+            df_stress = merge_by_date(df_stress_previous, df_stress)
+        df_stress = densify(df_stress)
+        print(f"Saving {len(df_stress)} stress records to {stress_output_path}")
+        write_frame(df_stress, stress_output_path)
+        write_rollups(df_stress, 'stress', stress_output_path, previous=df_stress_previous, new=df_stress_new)
+
     print("Loading Garmin sleep data...")
     tz_offset = None if args.timezone_offset == 'auto' else int(args.timezone_offset)
-    df_sleep = load_garmin_sleep(garmin_path, timezone_offset_hours=tz_offset)
+    df_sleep = load_garmin_sleep(
+        garmin_path, timezone_offset_hours=tz_offset, workers=args.jobs, files=sleep_files, stream=args.stream
+    )
     if tz_offset is None:
         print(f"Loaded {len(df_sleep)} sleep records (timezone: auto-detect Moscow/DC)")
     else:
         print(f"Loaded {len(df_sleep)} sleep records (timezone offset: {tz_offset:+d}h)")
 
     print("Merging datasets...")
-    if df_steps.empty and df_sleep.empty:
+    if df_steps.empty and df_sleep.empty and not incremental:
         print("Error: No data found in either steps or sleep data")
         return
     elif df_steps.empty:
@@ -39,16 +90,26 @@ def main(args):
     elif df_sleep.empty:
         df = df_steps
     else:
-        df = pd.merge(df_steps, df_sleep, on='date', how='outer')
+        df = join_daily([df_steps, df_sleep], dense=False)
 
     # Convert floors from meters to floor count (1 floor ≈ 3 meters)
     if 'floors_ascended_m' in df.columns:
         df['floors_climbed'] = df['floors_ascended_m'] / 3.0
         print(f"Converted floors from meters to floor count")
 
+    if args.store:
+        print(f"Upserting {upsert_daily(args.store, df)} days into {args.store}")
+
+    df_previous, df_new = None, df
+    if incremental:
+        print(f"Merging {len(df)} updated records into {output_path}")
+        df_previous = read_frame(output_path, parse_dates=['date', 'sleep_start', 'sleep_end'])
+        df = merge_by_date(df_previous, df)
+
     print(f"Saving combined data to {output_path}")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, sep='\t', index=False)
+    write_frame(df, output_path)
+    write_rollups(df, 'garmin', output_path, previous=df_previous, new=df_new)
+    save_manifest(manifest_path, {**uds_entries, **sleep_entries}, options)
 
     if args.verbose:
         print("\nData Summary:")
@@ -73,6 +134,10 @@ if __name__ == '__main__':
         default='../../data/my_garmin_data.tsv',
         help='Output TSV file path (default: ../../data/my_garmin_data.tsv)'
     )
+    parser.add_argument(
+        '--stress-output',
+        help='Also write stress TSV from the same UDS scan (e.g. ../../data/my_garmin_stress.tsv)'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -83,6 +148,26 @@ if __name__ == '__main__':
         default='auto',
         help='Timezone offset from GMT in hours, or "auto" to detect Moscow/DC transition (default: auto)'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to parse JSON files in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only parse new or changed export files and merge them into the existing output by date'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Parse JSON records one at a time to keep memory bounded on large exports'
+    )
+    parser.add_argument(
+        '--store',
+        help='Also upsert the parsed days into this SQLite daily store (e.g. ../../data/my_daily.db)'
+    )
 
     args = parser.parse_args()
     main(args)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Extract and process Garmin sleep data."""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add anal/utils directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'anal'))
+
+from utils.cache_utils import write_frame, read_frame
+from utils.garmin_utils import load_garmin_sleep, list_sleep_files
+from utils.manifest_utils import (
+    manifest_path_for, load_manifest, save_manifest, scan_files, merge_by_date
+)
+from utils.plot_utils import rollup_options, write_rollups
+from utils.store_utils import upsert_daily
+
+
+def main(args):
+    """Main execution function."""
+    garmin_path = Path(args.garmin_path)
+    output_path = Path(args.output)
+
+    # Decide which input files need parsing
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    options = {'timezone_offset': args.timezone_offset, 'store': args.store, 'rollups': rollup_options('sleep')}
+    sleep_files, sleep_entries = scan_files(list_sleep_files(garmin_path), manifest)
+
+    incremental = args.incremental and output_path.exists() and manifest['options'] == options
+    if incremental:
+        if not sleep_files:
+            print(f"No new or changed sleep files, {output_path} is up to date")
+            return
+        print(f"Incremental update: {len(sleep_files)} sleep files changed")
+    else:
+        sleep_files = None
+
+    print("Loading Garmin sleep data...")
+    tz_offset = None if args.timezone_offset == 'auto' else int(args.timezone_offset)
+    df_sleep = load_garmin_sleep(
+        garmin_path, timezone_offset_hours=tz_offset, workers=args.jobs, files=sleep_files, stream=args.stream
+    )
+    if tz_offset is None:
+        print(f"Loaded {len(df_sleep)} sleep records (timezone: auto-detect Moscow/DC)")
+    else:
+        print(f"Loaded {len(df_sleep)} sleep records (timezone offset: {tz_offset:+d}h)")
+
+    print("Calculating sleep duration...")
+    df_sleep['sleep_duration_h'] = (
+        df_sleep['sleep_end'] - df_sleep['sleep_start']
+    ).dt.total_seconds() / 3600
+
+    if args.store:
+        print(f"Upserting {upsert_daily(args.store, df_sleep)} days into {args.store}")
+
+    df_previous, df_new = None, df_sleep
+    if incremental:
+        print(f"Merging {len(df_sleep)} updated records into {output_path}")
+        df_previous = read_frame(output_path, parse_dates=['date', 'sleep_start', 'sleep_end'])
+        df_sleep = merge_by_date(df_previous, df_sleep)
+
+    print(f"Saving sleep data to {output_path}")
+    write_frame(df_sleep, output_path)
+    write_rollups(df_sleep, 'sleep', output_path, previous=df_previous, new=df_new)
+    save_manifest(manifest_path, sleep_entries, options)
+
+    if args.verbose:
+        print("\nData Summary:")
+        print(f"Date range: {df_sleep['date'].min()} to {df_sleep['date'].max()}")
+        print(f"Total records: {len(df_sleep)}")
+        print(f"Columns: {list(df_sleep.columns)}")
+        print("\nSleep duration statistics (hours):")
+        print(df_sleep['sleep_duration_h'].describe())
+        print("\nFirst few rows:")
+        print(df_sleep.head())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Extract and process Garmin sleep data'
+    )
+    parser.add_argument(
+        '--garmin-path',
+        default='./data/',
+        help='Path to Garmin data directory (default: ./data/)'
+    )
+    parser.add_argument(
+        '--output',
+        default='../../data/my_garmin_sleep.tsv',
+        help='Output TSV file path (default: ../../data/my_garmin_sleep.tsv)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print summary statistics'
+    )
+    parser.add_argument(
+        '--timezone-offset',
+        default='auto',
+        help='Timezone offset from GMT in hours, or "auto" to detect Moscow/DC transition (default: auto)'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to parse JSON files in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only parse new or changed export files and merge them into the existing output by date'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Parse JSON records one at a time to keep memory bounded on large exports'
+    )
+    parser.add_argument(
+        '--store',
+        help='Also upsert the parsed days into this SQLite daily store (e.g. ../../data/my_daily.db)'
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Extract and process Garmin activities/exercise data."""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add anal/utils directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'anal'))
+
+from utils.cache_utils import write_frame
+from utils.daily_utils import densify
+from utils.garmin_utils import load_garmin_activities, list_activity_files
+from utils.manifest_utils import manifest_path_for, load_manifest, save_manifest, scan_files
+from utils.plot_utils import rollup_options, write_rollups
+from utils.store_utils import upsert_daily
+
+
+def main(args):
+    """Main execution function."""
+    garmin_path = Path(args.garmin_path)
+    output_path = Path(args.output)
+
+    # Daily counts can combine activities from several files, so any change
+    # triggers a full re-parse; unchanged exports are skipped entirely
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    options = {'store': args.store, 'rollups': rollup_options('activities')}
+    activity_files, activity_entries = scan_files(list_activity_files(garmin_path), manifest)
+    if args.incremental and output_path.exists() and manifest['options'] == options and not activity_files:
+        print(f"No new or changed activity files, {output_path} is up to date")
+        return
+
+    print("Loading Garmin activities data...")
+    df_activities = load_garmin_activities(garmin_path, workers=args.jobs, stream=args.stream)
+    print(f"Loaded {len(df_activities)} activity records")
+
+    print("Calculating daily activity counts...")
+    # Count activities per day
+    daily_activities = df_activities.groupby('date').size().reset_index(name='activity_count')
+
+    # Fill missing dates with zero
+    if not daily_activities.empty:
+        print("Filling missing dates with zero activities...")
+        daily_activities = densify(daily_activities, fill_value=0)
+        daily_activities['activity_count'] = daily_activities['activity_count'].astype(int)
+
+    if args.store:
+        print(f"Upserting {upsert_daily(args.store, daily_activities)} days into {args.store}")
+
+    print(f"Saving activities data to {output_path}")
+    write_frame(daily_activities, output_path)
+    write_rollups(daily_activities, 'activities', output_path)
+    save_manifest(manifest_path, activity_entries, options)
+
+    if args.verbose:
+        print("\nData Summary:")
+        print(f"Date range: {daily_activities['date'].min()} to {daily_activities['date'].max()}")
+        print(f"Total days with activities: {len(daily_activities)}")
+        print(f"Total activities: {len(df_activities)}")
+        print(f"Columns: {list(daily_activities.columns)}")
+        print("\nActivity count statistics:")
+        print(daily_activities['activity_count'].describe())
+        print("\nActivity types:")
+        print(df_activities['activity_type'].value_counts().head(10))
+        print("\nFirst few rows:")
+        print(daily_activities.head())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Extract and process Garmin activities/exercise data'
+    )
+    parser.add_argument(
+        '--garmin-path',
+        default='./data/',
+        help='Path to Garmin data directory (default: ./data/)'
+    )
+    parser.add_argument(
+        '--output',
+        default='../../data/my_garmin_activities.tsv',
+        help='Output TSV file path (default: ../../data/my_garmin_activities.tsv)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print summary statistics'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to parse JSON files in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip re-parsing when no activity export file changed'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Parse JSON records one at a time to keep memory bounded on large exports'
+    )
+    parser.add_argument(
+        '--store',
+        help='Also upsert the parsed days into this SQLite daily store (e.g. ../../data/my_daily.db)'
+    )
+
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Extract and process Garmin stress data."""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add anal/utils directory to path to import utils
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'anal'))
+
+from utils.cache_utils import write_frame, read_frame
+from utils.daily_utils import densify
+from utils.garmin_utils import load_garmin_uds, load_garmin_stress, list_uds_files
+from utils.manifest_utils import (
+    manifest_path_for, load_manifest, save_manifest, scan_files, merge_by_date
+)
+from utils.plot_utils import rollup_options, write_rollups
+from utils.store_utils import upsert_daily
+
+
+def main(args):
+    """Main execution function."""
+    garmin_path = Path(args.garmin_path)
+    output_path = Path(args.output)
+
+    # Decide which input files need parsing
+    manifest_path = manifest_path_for(output_path)
+    manifest = load_manifest(manifest_path)
+    options = {'store': args.store, 'rollups': rollup_options('stress')}
+    uds_files, uds_entries = scan_files(list_uds_files(garmin_path), manifest)
+
+    incremental = args.incremental and output_path.exists() and manifest['options'] == options
+    if incremental:
+        if not uds_files:
+            print(f"No new or changed UDS files, {output_path} is up to date")
+            return
+        print(f"Incremental update: {len(uds_files)} UDS files changed")
+    else:
+        uds_files = None
+
+    print("Loading Garmin stress data...")
+    df_uds = load_garmin_uds(garmin_path, workers=args.jobs, files=uds_files, stream=args.stream)
+    df_stress = load_garmin_stress(garmin_path, uds=df_uds)
+    print(f"Loaded {len(df_stress)} stress records")
+
+    if args.store:
+        print(f"Upserting {upsert_daily(args.store, df_stress)} days into {args.store}")
+
+    df_previous, df_new = None, df_stress
+    if incremental:
+        print(f"Merging {len(df_stress)} updated records into {output_path}")
+        df_previous = read_frame(output_path, parse_dates=['date'])
+        df_stress = merge_by_date(df_previous, df_stress)
+
+    # Fill missing dates with zero (or we could use NaN)
+    if not df_stress.empty:
+        print("Filling missing dates...")
+        df_stress = densify(df_stress)
+
+    print(f"Saving stress data to {output_path}")
+    write_frame(df_stress, output_path)
+    write_rollups(df_stress, 'stress', output_path, previous=df_previous, new=df_new)
+    save_manifest(manifest_path, uds_entries, options)
+
+    if args.verbose:
+        print("\nData Summary:")
+        print(f"Date range: {df_stress['date'].min()} to {df_stress['date'].max()}")
+        print(f"Total records: {len(df_stress)}")
+        print(f"Records with stress data: {df_stress['avg_stress_level'].notna().sum()}")
+        print(f"Columns: {list(df_stress.columns)}")
+        print("\nAverage stress level statistics:")
+        print(df_stress['avg_stress_level'].describe())
+        print("\nFirst few rows:")
+        print(df_stress.head(10))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Extract and process Garmin stress data'
+    )
+    parser.add_argument(
+        '--garmin-path',
+        default='./data/',
+        help='Path to Garmin data directory (default: ./data/)'
+    )
+    parser.add_argument(
+        '--output',
+        default='../../data/my_garmin_stress.tsv',
+        help='Output TSV file path (default: ../../data/my_garmin_stress.tsv)'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print summary statistics'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes used to parse JSON files in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only parse new or changed export files and merge them into the existing output by date'
+    )
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Parse JSON records one at a time to keep memory bounded on large exports'
+    )
+    parser.add_argument(
+        '--store',
+        help='Also upsert the parsed days into this SQLite daily store (e.g. ../../data/my_daily.db)'
+    )
+
+    args = parser.parse_args()
+    main(args)
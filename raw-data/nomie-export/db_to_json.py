@@ -1,13 +1,46 @@
 #!/usr/bin/env python3
 """
 Convert Nomie SQLite database to JSON format.
+
+The analysis scripts can also read the database directly
+(utils.nomie_utils.load_nomie_data accepts the .db file), so this export
+is only needed when a JSON copy is wanted.
 """
 
+import argparse
 import sqlite3
 import json
 import os
 
-def db_to_json():
+
+def fetch_events(cursor, watermark=None, chunk_size=10000):
+    """Fetch events as dictionaries, newest first.
+
+    Args:
+        cursor: Cursor of a connection with row_factory = sqlite3.Row
+        watermark: Only fetch events with start >= watermark (epoch milliseconds)
+        chunk_size: Rows fetched per round trip
+
+    Returns:
+        List of event dictionaries
+    """
+    query = "SELECT * FROM events"
+    params = ()
+    if watermark is not None:
+        query += " WHERE start >= ?"
+        params = (watermark,)
+    cursor.execute(query + " ORDER BY start DESC", params)
+
+    events = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        events.extend(dict(row) for row in rows)
+    return events
+
+
+def db_to_json(incremental=False):
     # Get the directory where this script is located
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -18,28 +51,43 @@ def db_to_json():
     json_path = os.path.join(script_dir, '..', '..', 'data', 'my_nomie_events.json')
 
     try:
+        # Previously exported events; only newer ones are queried
+        existing = []
+        watermark = None
+        if incremental and os.path.exists(json_path):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if existing:
+                watermark = max(event['start'] for event in existing)
+
         # Connect to the SQLite database
         conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row  # This enables column access by name
         cursor = conn.cursor()
 
-        # Query all events
-        cursor.execute("SELECT * FROM events ORDER BY start DESC")
-        rows = cursor.fetchall()
+        # Query events (all of them, or those at/after the watermark)
+        new_events = fetch_events(cursor, watermark=watermark)
 
-        # Convert rows to list of dictionaries
-        events = [dict(row) for row in rows]
+        # Close the connection
+        conn.close()
+
+        if watermark is None:
+            events = new_events
+        else:
+            # Merge by event id so events at the watermark are not duplicated
+            events_by_id = {event['id']: event for event in existing}
+            events_by_id.update((event['id'], event) for event in new_events)
+            events = sorted(events_by_id.values(), key=lambda event: event['start'], reverse=True)
 
         # Write to JSON file with pretty printing
         with open(json_path, 'w', encoding='utf-8') as f:
             json.dump(events, f, indent=2, ensure_ascii=False)
 
         # Print confirmation
+        if watermark is not None:
+            print(f"Fetched {len(new_events)} events since watermark {watermark}")
         print(f"Successfully exported {len(events)} events to {json_path}")
 
-        # Close the connection
-        conn.close()
-
     except sqlite3.Error as e:
         print(f"Database error: {e}")
     except IOError as e:
@@ -47,5 +95,16 @@ def db_to_json():
     except Exception as e:
         print(f"Unexpected error: {e}")
 
+
 if __name__ == "__main__":
-    db_to_json()
+    parser = argparse.ArgumentParser(
+        description='Convert Nomie SQLite database to JSON format'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only fetch events newer than the existing JSON export and merge them in'
+    )
+
+    args = parser.parse_args()
+    db_to_json(incremental=args.incremental)